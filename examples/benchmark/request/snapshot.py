@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2015 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+
+"""Compare the per-request cost of retry snapshots against eager clones.
+
+Builds non-streaming requests the way PeerClientOperation.send does.
+Reports the time and the number of new gc-tracked objects per request,
+for the lazy snapshots Request takes now and for eagerly cloning every
+argstream, which is what Request used to do.
+
+Usage: python snapshot.py [number of requests]
+"""
+
+from __future__ import absolute_import
+
+import gc
+import sys
+import time
+
+from tchannel.tornado.request import Request
+from tchannel.tornado.stream import InMemStream
+
+
+def new_request():
+    return Request(
+        service='benchmark',
+        argstreams=[
+            InMemStream('endpoint'),
+            InMemStream('header'),
+            InMemStream('body' * 256),
+        ],
+        endpoint='endpoint',
+    )
+
+
+def new_request_with_clones():
+    request = new_request()
+    request._clones = [stream.clone() for stream in request.argstreams]
+    return request
+
+
+def measure(build, count):
+    gc.collect()
+    gc.disable()
+    try:
+        before = len(gc.get_objects())
+        start = time.time()
+        requests = [build() for _ in xrange(count)]
+        elapsed = time.time() - start
+        objects = len(gc.get_objects()) - before
+    finally:
+        gc.enable()
+
+    del requests
+    return elapsed / count * 1e6, float(objects) / count
+
+
+def main(count):
+    print '%-12s %12s %12s' % ('', 'us/request', 'objects/req')
+    for name, build in (
+        ('snapshot', new_request),
+        ('eager clone', new_request_with_clones),
+    ):
+        micros, objects = measure(build, count)
+        print '%-12s %12.2f %12.1f' % (name, micros, objects)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+    else:
+        count = 100000
+
+    main(count)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2015 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+
+"""Measure how long it takes to reassemble a fragmented call body.
+
+Feeds a CALL_REQ and its CALL_REQ_CONTINUE fragments through a
+MessageFactory, as a connection would, while get_arg reads the body back.
+Fragments are delivered in batches of one connection read chunk, with the
+IOLoop running in between, so the reader drains the stream several
+fragments at a time instead of finding it complete. Reassembly should grow
+linearly with the payload size.
+
+Usage: python reassembly.py [fragment size in bytes]
+"""
+
+from __future__ import absolute_import
+
+import os
+import sys
+import time
+
+from tornado import gen, ioloop
+from tchannel.messages import CallRequestContinueMessage
+from tchannel.messages import CallRequestMessage
+from tchannel.messages.common import FlagsType
+from tchannel.tornado.connection import TornadoConnection
+from tchannel.tornado.message_factory import MessageFactory
+from tchannel.tornado.util import get_arg
+
+
+SIZES = [2 ** n for n in range(16, 25)]  # 64KB to 16MB
+
+
+@gen.coroutine
+def reassemble(body, fragment_size):
+    factory = MessageFactory()
+    fragments = [
+        body[i:i + fragment_size]
+        for i in xrange(0, len(body), fragment_size)
+    ]
+
+    # Number of fragments that arrive with each read off the socket.
+    batch_size = max(TornadoConnection.read_chunk_size // fragment_size, 1)
+
+    start = time.time()
+    request = factory.build(CallRequestMessage(
+        flags=FlagsType.fragment,
+        service='benchmark',
+        headers={},
+        args=['endpoint', '', fragments[0]],
+        id=1,
+    ))
+    result_future = get_arg(request, 2)
+
+    for i, fragment in enumerate(fragments[1:], 2):
+        last = i == len(fragments)
+        factory.build(CallRequestContinueMessage(
+            flags=FlagsType.none if last else FlagsType.fragment,
+            args=[fragment],
+            id=1,
+        ))
+        if i % batch_size == 0:
+            # Let the reader catch up.
+            yield gen.moment
+    if len(fragments) == 1:
+        factory.build(CallRequestContinueMessage(args=[''], id=1))
+
+    result = yield result_future
+    elapsed = time.time() - start
+
+    assert result == body
+    raise gen.Return(elapsed)
+
+
+@gen.coroutine
+def main(fragment_size):
+    print '%10s %10s %10s' % ('bytes', 'fragments', 'seconds')
+    for size in SIZES:
+        body = os.urandom(size)
+        elapsed = yield reassemble(body, fragment_size)
+        print '%10d %10d %10.4f' % (
+            size, (size + fragment_size - 1) // fragment_size, elapsed,
+        )
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        fragment_size = int(sys.argv[1])
+    else:
+        fragment_size = 1024
+
+    ioloop.IOLoop.current().run_sync(lambda: main(fragment_size))
@@ -43,6 +43,9 @@ EventType = enum(
     after_receive_error=0x41,
     after_send_error=0x42,
     on_exception=0x50,
+    on_retry_denied=0x51,
+    on_cache_hit=0x52,
+    on_cache_miss=0x53,
 )
 
 
@@ -115,6 +118,38 @@ class EventHook(object):
         """
         pass
 
+    def on_retry_denied(self, request, err):
+        """Called when a retry is not made because the retry budget is
+        exhausted.
+
+        :param request:
+            The :py:class:`tchannel.tornado.request.Request` that would have
+            been retried.
+
+        :param err:
+            The error the request failed with.
+        """
+        pass
+
+    def on_cache_hit(self, request):
+        """Called when a request to an endpoint registered with a cache is
+        answered from the cache.
+
+        :param request:
+            The :py:class:`tchannel.tornado.request.Request` that was
+            answered.
+        """
+        pass
+
+    def on_cache_miss(self, request):
+        """Called when a request to an endpoint registered with a cache
+        isn't found in the cache and is passed on to the handler.
+
+        :param request:
+            The :py:class:`tchannel.tornado.request.Request` that missed.
+        """
+        pass
+
 
 class EventEmitter(object):
     def __init__(self):
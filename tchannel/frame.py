@@ -53,13 +53,42 @@ class FrameReadWriter(rw.ReadWriter):
         if not size:
             return None
 
-        body = self.take(stream, size - self.size_rw.width())
+        header = self.header_rw.read(stream)
+        payload = self.take(stream, size - self.width())
+        return Frame(header, payload)
 
-        header_width = self.header_rw.width()
-        header_body, payload = body[:header_width], body[header_width:]
+    def read_buffer(self, data, offset=0):
+        """Read the frame that starts at ``offset`` in ``data``.
+
+        Unlike ``read``, this doesn't copy the payload out of ``data``. The
+        payload of the returned frame is a ``buffer`` that references
+        ``data``; wrap it in a ``BytesIO`` to parse it.
+
+        :param data:
+            String containing one or more serialized frames.
+        :param offset:
+            Position of the frame in ``data``.
+        :returns:
+            A ``(frame, size)`` tuple, or None if ``data`` doesn't contain
+            the complete frame yet.
+        :raises ReadError:
+            If the frame size is smaller than the frame prelude.
+        """
+        width = self.width()
+        available = len(data) - offset
+        if available < self.size_rw.width():
+            return None
 
-        header = self.header_rw.read(BytesIO(header_body))
-        return Frame(header, payload)
+        stream = BytesIO(buffer(data, offset, width))
+        size = self.size_rw.read(stream)
+        if size < width:
+            raise ReadError("Invalid frame size %d" % size)
+        if available < size:
+            return None
+
+        header = self.header_rw.read(stream)
+        payload = buffer(data, offset + width, size - width)
+        return Frame(header, payload), size
 
     def write(self, frame, stream):
         prelude_size = self.size_rw.width() + self.header_rw.width()
@@ -71,6 +100,45 @@ class FrameReadWriter(rw.ReadWriter):
 
         return stream
 
+    def write_message(self, header, payload_rw, payload, stream):
+        """Write a frame whose payload is serialized by ``payload_rw``.
+
+        The payload is written straight into ``stream`` after room is made
+        for the frame prelude, which is filled in once the size of the
+        payload is known. This avoids serializing the payload into a
+        separate buffer first.
+
+        :param header:
+            FrameHeader for the frame.
+        :param payload_rw:
+            ReadWriter used to serialize ``payload``.
+        :param payload:
+            Object that makes up the payload of the frame.
+        :param stream:
+            Seekable stream to write to. It must be positioned at its end.
+            If the payload fails to serialize, the stream is truncated back
+            to where the frame started.
+        """
+        start = stream.tell()
+        # Placeholder for the size and header, filled in below.
+        stream.write(b'\x00' * self.width())
+        try:
+            payload_rw.write(payload, stream)
+            end = stream.tell()
+
+            stream.seek(start)
+            # Fails if the frame is too large for its size field.
+            self.size_rw.write(end - start, stream)
+            self.header_rw.write(header, stream)
+        except Exception:
+            # Don't leave a partial frame behind.
+            stream.seek(start)
+            stream.truncate()
+            raise
+        stream.seek(end)
+
+        return stream
+
     def width(self):
         return self.size_rw.width() + self.header_rw.width()
 
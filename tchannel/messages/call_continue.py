@@ -73,10 +73,17 @@ class CallContinueMessage(BaseMessage):
                 space_left -= key_length
 
                 if arg is not None:
+                    if isinstance(arg, unicode):
+                        # buffer() on unicode would expose its internal
+                        # representation rather than UTF-8.
+                        arg = arg.encode('utf-8')
                     arg_length = len(arg)
                     if space_left < arg_length:
-                        fragment_msg.args.append(arg[space_left:])
-                        new_args.append(arg[:space_left])
+                        # Split the arg into buffers that reference it
+                        # rather than slicing copies of it. Otherwise large
+                        # args get copied again for every fragment.
+                        fragment_msg.args.append(buffer(arg, space_left))
+                        new_args.append(buffer(arg, 0, space_left))
                         space_left = 0
                     else:
                         new_args.append(arg)
@@ -24,9 +24,12 @@ from . import common
 from .. import rw
 from ..glossary import DEFAULT_TIMEOUT
 from .base import BaseMessage
+from .types import Types
 
 
 class CancelMessage(BaseMessage):
+    message_type = Types.CANCEL
+
     __slots__ = BaseMessage.__slots__ + (
         'ttl',
         'tracing',
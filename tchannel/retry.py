@@ -40,3 +40,61 @@ DEFAULT = CONNECTION_ERROR
 #: The default number of times to retry a request. This is in addition to the
 #: original request.
 DEFAULT_RETRY_LIMIT = 4
+
+
+class RetryBudget(object):
+    """Limits retries to a fraction of recent successful requests.
+
+    This is a token bucket. Every successful request deposits ``ratio``
+    tokens and every retry withdraws one. On top of that, the bucket is
+    refilled at ``min_per_second`` tokens per second so that low-traffic
+    callers can still retry. The bucket never holds more than ``max_tokens``
+    tokens, so only recent successes count.
+
+    :param ratio:
+        Number of retries allowed per successful request.
+    :param min_per_second:
+        Number of retries per second that are always allowed.
+    :param max_tokens:
+        Maximum number of retries that can be saved up.
+    """
+
+    __slots__ = (
+        'ratio',
+        'min_per_second',
+        'max_tokens',
+
+        '_tokens',
+        '_updated_at',
+    )
+
+    def __init__(self, ratio=0.2, min_per_second=10.0, max_tokens=100.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+
+        # Start out with a second worth of retries.
+        self._tokens = min(min_per_second, max_tokens)
+        self._updated_at = None
+
+    def _refill(self, now):
+        if self._updated_at is not None and now > self._updated_at:
+            self._tokens = min(
+                self._tokens + (now - self._updated_at) * self.min_per_second,
+                self.max_tokens,
+            )
+        self._updated_at = now
+
+    def record_success(self, now):
+        """Record a successful request at the given time."""
+        self._refill(now)
+        self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def can_retry(self, now):
+        """Whether a retry is allowed at the given time."""
+        self._refill(now)
+        return self._tokens >= 1
+
+    def withdraw(self):
+        """Record that a retry is being made."""
+        self._tokens -= 1
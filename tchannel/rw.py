@@ -21,6 +21,7 @@
 from __future__ import absolute_import
 
 import struct
+from operator import attrgetter
 
 from .errors import ReadError
 
@@ -149,6 +150,10 @@ def instance(cls, *pairs):
     passed to the constructor. Further, while serializing, None will be passed
     to the serializer.
 
+    Runs of adjacent fixed-width fields (numbers, zero constants and nested
+    instances made up of those) are packed and unpacked together with a single
+    precompiled ``struct.Struct``.
+
     :param cls:
         A class with an ``__init__`` method accepting keyword arguments for
         all items specified in ``pairs``
@@ -524,16 +529,31 @@ class NamedChainReadWriter(ReadWriter):
 
 class InstanceReadWriter(ReadWriter):
 
-    __slots__ = ('_cls', '_pairs',)
+    __slots__ = ('_cls', '_pairs', '_steps', '_fixed')
 
     def __init__(self, cls, pairs):
         self._pairs = pairs
         self._cls = cls
 
+        # Runs of two or more adjacent fixed-width fields are read and written
+        # in one go with a FixedWidthRun. Everything else is handled one field
+        # at a time.
+        self._steps = _compile_pairs(pairs)
+
+        # If all fields are fixed-width, this is used to pack the instance
+        # together with its neighbours when it is nested inside another
+        # instance.
+        self._fixed = None
+        if all(_fixed_format(name, rw) is not None for name, rw in pairs):
+            self._fixed = FixedWidthRun(pairs)
+
     def read(self, stream):
         kwargs = {}
         try:
-            for attr, rw in self._pairs:
+            for attr, rw in self._steps:
+                if attr is None:
+                    rw.read(stream, kwargs)
+                    continue
                 value = rw.read(stream)
                 if attr != skip:
                     kwargs[attr] = value
@@ -545,8 +565,10 @@ class InstanceReadWriter(ReadWriter):
         return self._cls(**kwargs)
 
     def write(self, obj, stream):
-        for attr, rw in self._pairs:
-            if attr != skip:
+        for attr, rw in self._steps:
+            if attr is None:
+                rw.write(obj, stream)
+            elif attr != skip:
                 value = getattr(obj, attr)
                 rw.write(value, stream)
             else:
@@ -581,6 +603,144 @@ class InstanceReadWriter(ReadWriter):
         return size
 
 
+class FixedWidthRun(object):
+    """A run of fixed-width ``(name, ReadWriter)`` pairs of an instance.
+
+    All the numbers in the run are packed and unpacked with a single
+    precompiled ``struct.Struct`` rather than one call per field. Constant
+    zeros are written as pad bytes, and nested instances made up entirely of
+    fixed-width fields are flattened into the run.
+    """
+
+    __slots__ = ('format', 'paths', '_struct', '_getter', '_fields')
+
+    def __init__(self, pairs):
+        formats = []
+
+        # Dotted attribute paths for every number packed by the struct.
+        paths = []
+
+        # (name, rw, start, end) for every field that needs a value when
+        # reading. rw is None for numbers, which take the unpacked value
+        # at start as-is.
+        fields = []
+
+        start = 0
+        for name, rw in pairs:
+            fmt = _fixed_format(name, rw)
+            assert fmt is not None, "%s is not fixed-width" % name
+            formats.append(fmt)
+
+            if type(rw) is NumberReadWriter:
+                paths.append(name)
+            elif isinstance(rw, InstanceReadWriter):
+                paths.extend(name + '.' + p for p in rw._fixed.paths)
+
+            end = start + len(fmt) - fmt.count('x')
+            if name != skip:
+                if type(rw) is NumberReadWriter:
+                    rw = None
+                fields.append((name, rw, start, end))
+            start = end
+
+        self.format = ''.join(formats)
+        self.paths = tuple(paths)
+        self._struct = struct.Struct('>' + self.format)
+        self._fields = tuple(fields)
+
+        if len(paths) == 1:
+            getter = attrgetter(paths[0])
+            self._getter = lambda obj: (getter(obj),)
+        elif paths:
+            self._getter = attrgetter(*paths)
+        else:
+            self._getter = lambda obj: ()
+
+    def width(self):
+        return self._struct.size
+
+    def read(self, stream, kwargs):
+        """Read the run from the stream into the given dictionary."""
+        size = self._struct.size
+        data = stream.read(size)
+        if len(data) != size:
+            raise ReadError(
+                "Expected %d bytes but got %d bytes." % (size, len(data))
+            )
+        self.unpack(self._struct.unpack(data), kwargs)
+
+    def unpack(self, values, kwargs):
+        """Fill kwargs with field values from the unpacked numbers."""
+        for name, rw, start, end in self._fields:
+            if rw is None:
+                kwargs[name] = values[start]
+            elif isinstance(rw, InstanceReadWriter):
+                rw_kwargs = {}
+                rw._fixed.unpack(values[start:end], rw_kwargs)
+                kwargs[name] = rw._cls(**rw_kwargs)
+            elif isinstance(rw, ConstantReadWriter):
+                kwargs[name] = rw._value
+            else:
+                kwargs[name] = None
+
+    def write(self, obj, stream):
+        """Write the run for the attributes of the given object."""
+        stream.write(self._struct.pack(*self._getter(obj)))
+
+
+def _fixed_format(name, rw):
+    """Get the struct format for the given field of an instance.
+
+    Returns None if the field can't be packed as part of a FixedWidthRun.
+    """
+    if type(rw) is NumberReadWriter:
+        if name == skip:
+            # Skipped numbers are written as None which doesn't pack.
+            return None
+        return rw._format[1:]
+    elif isinstance(rw, NoneReadWriter):
+        return ''
+    elif isinstance(rw, ConstantReadWriter):
+        if isinstance(rw._rw, NoneReadWriter):
+            return ''
+        if type(rw._rw) is NumberReadWriter and rw._value == 0:
+            return 'x' * rw._rw.width()
+    elif isinstance(rw, InstanceReadWriter) and rw._fixed is not None:
+        return rw._fixed.format
+    return None
+
+
+def _compile_pairs(pairs):
+    """Group runs of adjacent fixed-width pairs into FixedWidthRuns.
+
+    :param pairs:
+        ``(name, ReadWriter)`` pairs as passed to :py:func:`instance`.
+    :returns:
+        A list of ``(name, ReadWriter)`` pairs in the same order, where each
+        run of two or more fixed-width pairs has been replaced with a
+        ``(None, FixedWidthRun)`` pair.
+    """
+    steps = []
+    run = []
+
+    def end_run():
+        if len(run) > 1:
+            steps.append((None, FixedWidthRun(run)))
+        else:
+            steps.extend(run)
+        del run[:]
+
+    for name, rw in pairs:
+        if _fixed_format(name, rw) is None:
+            end_run()
+            steps.append((name, rw))
+        else:
+            run.append((name, rw))
+    end_run()
+
+    return steps
+
+
 class HeadersReadWriter(ReadWriter):
     """See :py:func:`headers` for documentation."""
 
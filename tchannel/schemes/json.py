@@ -50,6 +50,7 @@ class JsonArgScheme(object):
         hostport=None,
         shard_key=None,
         trace=None,
+        hedge_delay=None,
     ):
         """Make JSON TChannel Request.
 
@@ -86,6 +87,10 @@ class JsonArgScheme(object):
         :param string hostport:
             A 'host:port' value to use when making a request directly to a
             TChannel service, bypassing Hyperbahn.
+        :param float hedge_delay:
+            Seconds after which a copy of the request is sent to another
+            peer if no response arrived yet. Only use this for idempotent
+            endpoints.
 
         :rtype: Response
         """
@@ -107,6 +112,7 @@ class JsonArgScheme(object):
             hostport=hostport,
             shard_key=shard_key,
             trace=trace,
+            hedge_delay=hedge_delay,
         )
 
         # deserialize
@@ -45,6 +45,7 @@ class RawArgScheme(object):
         hostport=None,
         shard_key=None,
         trace=None,
+        hedge_delay=None,
     ):
         """Make a raw TChannel request.
 
@@ -84,6 +85,10 @@ class RawArgScheme(object):
         :param string hostport:
             A 'host:port' value to use when making a request directly to a
             TChannel service, bypassing Hyperbahn.
+        :param float hedge_delay:
+            Seconds after which a copy of the request is sent to another
+            peer if no response arrived yet. Only use this for idempotent
+            endpoints.
 
         :rtype: Response
         """
@@ -100,6 +105,7 @@ class RawArgScheme(object):
             hostport=hostport,
             shard_key=shard_key,
             trace=trace,
+            hedge_delay=hedge_delay,
         )
 
     def register(self, endpoint, **kwargs):
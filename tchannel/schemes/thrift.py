@@ -69,6 +69,7 @@ class ThriftArgScheme(object):
         retry_limit=None,
         shard_key=None,
         trace=None,
+        hedge_delay=None,
     ):
         if not headers:
             headers = {}
@@ -99,6 +100,7 @@ class ThriftArgScheme(object):
             hostport=request.hostport,
             shard_key=shard_key,
             trace=trace,
+            hedge_delay=hedge_delay,
         )
 
         response.headers = serializer.deserialize_header(
@@ -80,7 +80,9 @@ class TChannel(object):
     """
 
     def __init__(self, name, hostport=None, process_name=None,
-                 known_peers=None, trace=False):
+                 known_peers=None, trace=False, peer_chooser=None,
+                 peer_scorer=None, retry_budget=None,
+                 service_retry_budgets=None, retry_backoff=None):
         """
         **Note:** In general only one ``TChannel`` instance should be used at a
         time. Multiple ``TChannel`` instances are not advisable and could
@@ -95,6 +97,29 @@ class TChannel(object):
             An optional host/port to serve on, e.g., ``"127.0.0.1:5555``. If
             not provided an ephemeral port will be used. When advertising on
             Hyperbahn you callers do not need to know your port.
+
+        :param peer_chooser:
+            PeerChooser used to pick the peer each request is sent to.
+            Defaults to picking the peer with the highest score. Use a
+            ``ConsistentHashChooser`` to send requests with the same
+            ``shard_key`` to the same peer.
+
+        :param peer_scorer:
+            PeerScorer used to rank peers when choosing where to send
+            requests. Defaults to scoring peers by their state.
+
+        :param retry_budget:
+            A ``tchannel.retry.RetryBudget`` that limits the retries made
+            through this TChannel to a fraction of its successful requests.
+            Retries are not limited by default.
+
+        :param service_retry_budgets:
+            A dictionary from service name to ``RetryBudget`` for services
+            that need their own limits on top of ``retry_budget``.
+
+        :param retry_backoff:
+            If specified, retries wait for a random time of up to
+            ``retry_backoff * 2 ** attempt`` seconds.
         """
 
         # until we move everything here,
@@ -106,6 +131,11 @@ class TChannel(object):
             known_peers=known_peers,
             trace=trace,
             dispatcher=DeprecatedDispatcher(_handler_returns_response=True),
+            peer_chooser=peer_chooser,
+            peer_scorer=peer_scorer,
+            retry_budget=retry_budget,
+            service_retry_budgets=service_retry_budgets,
+            retry_backoff=retry_backoff,
         )
 
         self.name = name
@@ -139,12 +169,18 @@ class TChannel(object):
         hostport=None,
         shard_key=None,
         trace=None,
+        hedge_delay=None,
     ):
         """Make low-level requests to TChannel services.
 
         **Note:** Usually you would interact with a higher-level arg scheme
         like :py:class:`tchannel.schemes.JsonArgScheme` or
         :py:class:`tchannel.schemes.ThriftArgScheme`.
+
+        :param hedge_delay:
+            If specified, a copy of the request is sent to another peer if no
+            response arrived after this many seconds, and whichever response
+            comes first is used. Only use this for idempotent calls.
         """
 
         # TODO - dont use asserts for public API
@@ -198,6 +234,7 @@ class TChannel(object):
             retry_limit=retry_limit,
             ttl=timeout,
             traceflag=traceflag,
+            hedge_delay=hedge_delay,
         )
 
         # unwrap response
@@ -230,6 +267,38 @@ class TChannel(object):
     def hostport(self):
         return self._dep_tchannel.hostport
 
+    def subchannel(self, service, known_peers=None, **kwargs):
+        """Get the subchannel for the given service.
+
+        Calls to a service with a subchannel only go to the peers of that
+        subchannel, chosen with its own chooser, scorer and connection
+        limits.
+
+        .. code-block:: python
+
+            tchannel.subchannel(
+                'geo', known_peers=['10.0.0.1:4040', '10.0.0.2:4040'],
+                chooser=ConsistentHashChooser(),
+            )
+
+        :param string service:
+            Name of the service.
+
+        :param known_peers:
+            Host-ports at which the service can be reached.
+
+        :param kwargs:
+            Options for the subchannel's ``PeerGroup``, for example
+            ``chooser``, ``scorer`` or ``max_connections``. Only allowed the
+            first time the subchannel is requested.
+
+        :returns:
+            The ``PeerGroup`` of the subchannel.
+        """
+        return self._dep_tchannel.subchannel(
+            service, known_peers=known_peers, **kwargs
+        )
+
     def register(self, scheme, endpoint=None, handler=None, **kwargs):
 
         def decorator(fn):
@@ -60,6 +60,7 @@ class PatchedClientOperation(object):
         retry=None,
         parent_tracing=None,
         score_threshold=None,
+        scorer=None,
     ):
         self.vcr_client = vcr_client
         self.hostport = hostport
@@ -67,14 +68,16 @@ class PatchedClientOperation(object):
         self.arg_scheme = arg_scheme or schemes.DEFAULT
         self.original_tchannel = original_tchannel
 
-        # TODO what to do with retry, parent_tracing and score_threshold
+        # TODO what to do with retry, parent_tracing, score_threshold and
+        # scorer
 
     @gen.coroutine
     def send(self, arg1, arg2, arg3,
              headers=None,
              traceflag=None,
              retry_limit=None,
-             ttl=None):
+             ttl=None,
+             hedge_delay=None):
         arg1, arg2, arg3 = map(maybe_stream, [arg1, arg2, arg3])
 
         endpoint = yield read_full(arg1)
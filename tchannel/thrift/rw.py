@@ -280,7 +280,7 @@ class Function(object):
     __repr__ = __str__
 
 
-def register(dispatcher, service, handler=None, method=None):
+def register(dispatcher, service, handler=None, method=None, cache=None):
     """
     :param dispatcher:
         RequestDispatcher against which the new endpoint will be registered.
@@ -292,6 +292,9 @@ def register(dispatcher, service, handler=None, method=None):
     :param method:
         If specified, name of the method being registered. Defaults to the
         name of the ``handler`` function.
+    :param cache:
+        ``LRUCache`` to answer repeated requests from. See
+        ``RequestDispatcher.register``.
     """
 
     def decorator(method, handler):
@@ -310,6 +313,7 @@ def register(dispatcher, service, handler=None, method=None):
             handler,
             ThriftRWSerializer(service._module, function.request_cls),
             ThriftRWSerializer(service._module, function.response_cls),
+            cache=cache,
         )
         return handler
 
@@ -32,7 +32,8 @@ from tchannel.tornado.response import StatusCode
 from ..serializer.thrift import ThriftSerializer
 
 
-def register(dispatcher, service_module, handler, method=None, service=None):
+def register(dispatcher, service_module, handler, method=None, service=None,
+             cache=None):
     """Registers a Thrift service method with the given RequestDispatcher.
 
     .. code-block:: python
@@ -65,6 +66,9 @@ def register(dispatcher, service_module, handler, method=None, service=None):
         name of ``service_module``.
     :param method:
         Name of the method. Defaults to the name of the ``handler`` function.
+    :param cache:
+        ``LRUCache`` to answer repeated requests from. See
+        ``RequestDispatcher.register``.
     """
     if not service:
         service = service_module.__name__.rsplit('.', 1)[-1]
@@ -95,7 +99,8 @@ def register(dispatcher, service_module, handler, method=None, service=None):
         endpoint,
         handler,
         ThriftSerializer(args_type),
-        ThriftSerializer(result_type)
+        ThriftSerializer(result_type),
+        cache=cache,
     )
     return handler
 
@@ -0,0 +1,243 @@
+# Copyright (c) 2015 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from __future__ import absolute_import
+from __future__ import division
+
+from collections import deque
+
+from ..errors import BusyError
+from ..errors import DeclinedError
+from ..errors import FatalProtocolError
+from ..errors import NetworkError
+from ..errors import TimeoutError
+from ..errors import UnhealthyError
+
+# Errors that say something about the health of the peer rather than about
+# the request.
+PEER_FAILURES = (
+    BusyError,
+    DeclinedError,
+    FatalProtocolError,
+    NetworkError,
+    TimeoutError,
+    UnhealthyError,
+)
+
+
+class CircuitBreaker(object):
+    """Tracks failures of requests to a Peer and ejects it when it's down.
+
+    The breaker trips once ``max_failures`` requests in a row failed, or once
+    at least ``max_error_ratio`` of the last ``window`` requests failed. A
+    tripped breaker keeps the peer from being chosen for ``backoff``
+    seconds. After that, a single probe request is let through. If the probe
+    succeeds the breaker resets, otherwise the backoff is doubled, up to
+    ``max_backoff`` seconds.
+
+    Only the outcome of the probe decides whether an open breaker resets.
+    Outcomes of requests that were sent before the breaker last tripped or
+    reset are ignored.
+
+    :param max_failures:
+        Number of consecutive failures that trip the breaker.
+    :param max_error_ratio:
+        Fraction of failures in the window that trips the breaker.
+    :param window:
+        Number of recent requests the error ratio is calculated over.
+    :param backoff:
+        Seconds the peer is ejected for the first time the breaker trips.
+    :param max_backoff:
+        Maximum number of seconds the peer is ejected for.
+    """
+
+    __slots__ = (
+        'max_failures',
+        'max_error_ratio',
+        'backoff',
+        'max_backoff',
+
+        '_outcomes',
+        '_num_failures',
+        '_consecutive_failures',
+        '_current_backoff',
+        '_retry_at',
+        '_probe_deadline',
+        '_probe_reserved',
+        '_changed_at',
+    )
+
+    def __init__(self, max_failures=5, max_error_ratio=0.5, window=20,
+                 backoff=1.0, max_backoff=30.0):
+        self.max_failures = max_failures
+        self.max_error_ratio = max_error_ratio
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        # Outcomes of the last ``window`` requests. True for failures.
+        self._outcomes = deque(maxlen=window)
+        self._num_failures = 0
+        self._consecutive_failures = 0
+
+        self._current_backoff = backoff
+
+        # Time after which a probe may be sent if the breaker is open, or
+        # None if it's closed.
+        self._retry_at = None
+
+        # Time after which another probe may be sent if one is in flight.
+        self._probe_deadline = None
+
+        # Whether the probe slot is held for a request that hasn't been sent
+        # yet.
+        self._probe_reserved = False
+
+        # Time at which the breaker last tripped or reset.
+        self._changed_at = None
+
+    @property
+    def is_open(self):
+        """Whether the breaker has tripped and hasn't been reset yet."""
+        return self._retry_at is not None
+
+    def available(self, now):
+        """Whether requests may be sent to the peer at the given time."""
+        if self._retry_at is None:
+            return True
+        if now < self._retry_at:
+            return False
+        return self._probe_deadline is None or now >= self._probe_deadline
+
+    def reserve_probe(self, now):
+        """Hold the probe slot for a request that is about to be sent.
+
+        Call this when the peer is chosen. Other requests then don't see the
+        peer as available while the connection for the probe is set up.
+        """
+        if self._retry_at is not None and self.available(now):
+            self._probe_deadline = now + self._current_backoff
+            self._probe_reserved = True
+
+    def before_request(self, now):
+        """Record that a request is being sent to the peer.
+
+        :returns:
+            True if the request is the probe of the open breaker. Pass this
+            on to ``record_success`` or ``record_failure``.
+        """
+        if self._retry_at is None or now < self._retry_at:
+            return False
+        if (not self._probe_reserved and
+                self._probe_deadline is not None and
+                now < self._probe_deadline):
+            # Another probe is in flight.
+            return False
+
+        # Give up on the probe if we don't hear back in time so that the
+        # peer isn't ejected forever.
+        self._probe_deadline = now + self._current_backoff
+        self._probe_reserved = False
+        return True
+
+    def release_probe(self, probe):
+        """Give up the probe slot without recording an outcome.
+
+        Use this when the caller abandons a request before hearing back, so
+        that another request can probe the peer right away.
+
+        :param probe:
+            What ``before_request`` returned for the request
+        """
+        if probe and self._retry_at is not None:
+            self._probe_deadline = None
+            self._probe_reserved = False
+
+    def _is_stale(self, sent_at, probe):
+        if self._changed_at is not None and sent_at < self._changed_at:
+            return True
+        # While the breaker is open, only the probe counts.
+        return self._retry_at is not None and not probe
+
+    def record_success(self, sent_at, probe=False):
+        """Record that the peer served a request.
+
+        :param sent_at:
+            Time at which the request was sent
+        :param probe:
+            What ``before_request`` returned for the request
+        """
+        if self._is_stale(sent_at, probe):
+            return
+        if self._retry_at is not None:
+            # The probe succeeded.
+            self._reset(sent_at)
+        self._consecutive_failures = 0
+        self._add_outcome(False)
+
+    def record_failure(self, now, sent_at, probe=False):
+        """Record that a request to the peer failed.
+
+        :param now:
+            Time at which the request failed
+        :param sent_at:
+            Time at which the request was sent
+        :param probe:
+            What ``before_request`` returned for the request
+        """
+        if self._is_stale(sent_at, probe):
+            return
+        if self._retry_at is not None:
+            # The probe failed.
+            self._current_backoff = min(
+                self._current_backoff * 2, self.max_backoff
+            )
+            self._trip(now)
+            return
+
+        self._consecutive_failures += 1
+        self._add_outcome(True)
+
+        window = len(self._outcomes)
+        if self._consecutive_failures >= self.max_failures:
+            self._trip(now)
+        elif (window == self._outcomes.maxlen and
+                self._num_failures >= self.max_error_ratio * window):
+            self._trip(now)
+
+    def _add_outcome(self, failed):
+        if len(self._outcomes) == self._outcomes.maxlen:
+            self._num_failures -= self._outcomes[0]
+        self._outcomes.append(failed)
+        self._num_failures += failed
+
+    def _trip(self, now):
+        self._retry_at = now + self._current_backoff
+        self._probe_deadline = None
+        self._probe_reserved = False
+        self._changed_at = now
+
+    def _reset(self, now):
+        self._retry_at = None
+        self._probe_deadline = None
+        self._probe_reserved = False
+        self._changed_at = now
+        self._current_backoff = self.backoff
+        self._outcomes.clear()
+        self._num_failures = 0
@@ -0,0 +1,101 @@
+# Copyright (c) 2015 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from __future__ import absolute_import
+
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """Size-bounded cache that evicts the least recently used entry first.
+
+    Used by ``RequestDispatcher`` to keep responses for endpoints registered
+    with ``cache=``. ``hits``, ``misses`` and ``evictions`` count how the
+    cache has been doing.
+
+    :param maxsize:
+        Maximum number of entries kept.
+    :param ttl:
+        Number of seconds an entry stays valid for. Entries don't expire if
+        this is None.
+    """
+
+    __slots__ = (
+        'maxsize',
+        'ttl',
+        'hits',
+        'misses',
+        'evictions',
+
+        '_entries',
+    )
+
+    def __init__(self, maxsize=1024, ttl=None):
+        assert maxsize > 0, "maxsize must be positive"
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # key -> (value, expires_at), least recently used first.
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, now):
+        """Look up the value for ``key``.
+
+        :param now:
+            Current time in seconds. Expired entries are dropped.
+        :returns:
+            The cached value, or None if there isn't an unexpired one.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None or (entry[1] is not None and entry[1] <= now):
+            self.misses += 1
+            return None
+
+        # Move it to the most recently used end.
+        self._entries[key] = entry
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key, value, now):
+        """Store ``value`` for ``key``, evicting the least recently used
+        entry if the cache is full.
+
+        :param now:
+            Current time in seconds, used to work out when the entry expires.
+        """
+        self._entries.pop(key, None)
+        expires_at = now + self.ttl if self.ttl is not None else None
+        self._entries[key] = (value, expires_at)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
@@ -22,19 +22,24 @@ from __future__ import absolute_import
 
 import logging
 import os
+from collections import Counter
 import socket
 import sys
 
+import tornado.concurrent
 import tornado.gen
+import tornado.ioloop
 import tornado.iostream
 
 from .. import errors
 from .. import frame
 from .. import glossary
 from .. import messages
+from ..errors import CanceledError
 from ..errors import NetworkError
 from ..errors import FatalProtocolError
 from ..errors import TChannelError
+from ..errors import TimeoutError
 from ..event import EventType
 from ..io import BytesIO
 from ..messages.common import PROTOCOL_VERSION
@@ -43,7 +48,8 @@ from ..messages.common import StreamState
 from ..messages.error import ErrorMessage
 from ..messages.types import Types
 from .message_factory import MessageFactory
-from .util import chain
+from .stream import InMemStream
+from .timeout import TimerWheel
 
 try:
     import tornado.queues as queues  # included in 4.2
@@ -79,12 +85,28 @@ class TornadoConnection(object):
     CALL_REQ_TYPES = frozenset([Types.CALL_REQ, Types.CALL_REQ_CONTINUE])
     CALL_RES_TYPES = frozenset([Types.CALL_RES, Types.CALL_RES_CONTINUE])
 
+    # Once the handshake is done, up to this many bytes are read off the
+    # socket at a time and every complete frame in them is processed in one
+    # go. If this is 0, frames are read off the socket one at a time.
+    read_chunk_size = 64 * 1024
+
+    # Frames written during the same IOLoop iteration are gathered up and
+    # sent to the socket in a single write. If more than this many bytes are
+    # waiting to be written, they are flushed right away.
+    write_high_water_mark = 256 * 1024
+
     def __init__(self, connection, tchannel=None):
         assert connection, "connection is required"
 
         self.closed = False
         self.connection = connection
 
+        # Called once this connection is closed.
+        self._close_callback = None
+
+        # IOLoop time at which a frame was last received or written.
+        self.last_activity = tornado.ioloop.IOLoop.current().time()
+
         sockname = connection.socket.getsockname()
         if len(sockname) == 2:
             (self.remote_host,
@@ -116,6 +138,31 @@ class TornadoConnection(object):
         # Map from message ID to futures for responses of outgoing calls.
         self._outstanding = {}
 
+        # Map from message ID to the (request, response) pair of incoming
+        # calls that are still being served.
+        self.incoming_calls = {}
+
+        # IDs of incoming calls that were cancelled while their fragments
+        # were still arriving. The rest of their fragments are dropped.
+        self._cancelled_calls = set()
+
+        # Timeouts for outgoing calls, keyed by message ID.
+        self._timeouts = TimerWheel(self._expire_requests)
+
+        # Buffer of serialized frames waiting to be written in the next
+        # flush, the number of frames in it, and a Future that resolves once
+        # they've been written.
+        self._write_buffer = BytesIO()
+        self._write_buffer_frames = 0
+        self._write_future = None
+
+        # Map from the number of frames written by a flush to the number of
+        # flushes that wrote that many frames.
+        self.frames_per_flush = Counter()
+
+        # Bytes received off the wire that don't make up a full frame yet.
+        self._recv_buffer = b''
+
         # Whether _loop is running. The loop doesn't run until after the
         # handshake has been performed.
         self._loop_running = False
@@ -124,6 +171,23 @@ class TornadoConnection(object):
 
         connection.set_close_callback(self._on_close)
 
+    @property
+    def outstanding_requests(self):
+        """Number of outgoing calls still waiting for a response."""
+        return len(self._outstanding)
+
+    @property
+    def idle(self):
+        """True if there are no calls in flight in either direction."""
+        return not self._outstanding and not self.incoming_calls
+
+    def set_close_callback(self, callback):
+        """Call the given function once this connection is closed.
+
+        Replaces any previously set close callback.
+        """
+        self._close_callback = callback
+
     def next_message_id(self):
         self._id_sequence = (self._id_sequence + 1) % glossary.MAX_MESSAGE_ID
         return self._id_sequence
@@ -138,6 +202,11 @@ class TornadoConnection(object):
                 )
             )
         self._outstanding = {}
+        self._timeouts.clear()
+
+        if self._close_callback is not None:
+            callback, self._close_callback = self._close_callback, None
+            callback()
 
         try:
             while True:
@@ -170,9 +239,7 @@ class TornadoConnection(object):
 
             body = read_body_future.result()
             f = frame.frame_rw.read(BytesIO(body), size=size)
-            message_rw = messages.RW[f.header.message_type]
-            message = message_rw.read(BytesIO(f.payload))
-            message.id = f.header.message_id
+            message = self._read_message(f)
             message_future.set_result(message)
 
         def on_read_size(read_size_future):
@@ -206,57 +273,186 @@ class TornadoConnection(object):
 
         return message_future
 
-    @tornado.gen.coroutine
+    @staticmethod
+    def _read_message(f):
+        """Parse the message carried by the given frame.
+
+        :param f:
+            Frame whose payload is either a string or a ``buffer``.
+        """
+        message_rw = messages.RW[f.header.message_type]
+        message = message_rw.read(BytesIO(f.payload))
+        message.id = f.header.message_id
+        return message
+
     def _loop(self):
         # Receive messages off the wire. All messages are either responses to
         # outstanding requests or calls.
         #
         # Must be started only after the handshake has been performed.
         self._loop_running = True
+        if self.read_chunk_size:
+            self._read_chunks()
+        else:
+            self._read_frames()
+
+    @tornado.gen.coroutine
+    def _read_frames(self):
+        # Read one frame at a time off the wire.
         while not self.closed:
             message = yield self._recv()
             # TODO: There should probably be a try-catch on the yield.
-            if message.message_type in self.CALL_REQ_TYPES:
-                self._messages.put(message)
-                continue
+            self._handle_message(message)
 
-            elif message.id in self._outstanding:
-                # set exception if receive error message
-                if message.message_type == Types.ERROR:
-                    future = self._outstanding.pop(message.id)
-                    if future.running():
-                        error = TChannelError.from_code(
-                            message.code,
-                            description=message.description,
-                        )
-                        future.set_exception(error)
-                    else:
-                        protocol_exception = (
-                            self.response_message_factory.build(message)
-                        )
-                        if protocol_exception:
-                            self.event_emitter.fire(
-                                EventType.after_receive_error,
-                                protocol_exception,
-                            )
-                    continue
-
-                response = self.response_message_factory.build(message)
-
-                # keep continue message in the list
-                # pop all other type messages including error message
-                if (message.message_type in self.CALL_RES_TYPES and
-                        message.flags == FlagsType.fragment):
-                    # still streaming, keep it for record
-                    future = self._outstanding.get(message.id)
+    def _read_chunks(self):
+        """Receive messages off the wire in large chunks.
+
+        Reads up to ``read_chunk_size`` bytes at a time into a receive buffer
+        and hands every complete frame in it to ``_handle_message``. Partial
+        frames are kept in the buffer until the rest of their bytes arrive.
+        """
+        read_buffer = frame.frame_rw.read_buffer
+        io_loop = tornado.ioloop.IOLoop.current()
+
+        def on_chunk(read_future):
+            if read_future.exception():
+                exception = read_future.exception()
+                if not isinstance(
+                    exception, tornado.iostream.StreamClosedError
+                ):
+                    log.error("Failed to read from %s:%s: %s",
+                              self.remote_host, self.remote_host_port,
+                              exception)
+                return self.close()
+
+            data = self._recv_buffer + read_future.result()
+            offset = 0
+
+            try:
+                # Frames are parsed straight out of the received data; their
+                # payloads aren't copied until the message is read.
+                while True:
+                    result = read_buffer(data, offset)
+                    if result is None:
+                        break
+                    f, size = result
+                    self._handle_message(self._read_message(f))
+                    offset += size
+            except Exception:
+                log.exception(
+                    "Failed to process messages from %s:%s",
+                    self.remote_host, self.remote_host_port,
+                )
+                return self.close()
+
+            self._recv_buffer = data[offset:]
+            read_next()
+
+        def read_next():
+            if self.closed:
+                return
+            io_loop.add_future(
+                self.connection.read_bytes(self.read_chunk_size, partial=True),
+                on_chunk,
+            )
+
+        read_next()
+
+    def _handle_message(self, message):
+        """Route a message received after the handshake.
+
+        Calls are queued up for ``await``, cancellations are applied right
+        away and everything else is matched against outstanding requests.
+        """
+        self.last_activity = tornado.ioloop.IOLoop.current().time()
+
+        if message.message_type in self.CALL_REQ_TYPES:
+            self._messages.put(message)
+            return
+
+        elif message.message_type == Types.CANCEL:
+            self._handle_cancel(message)
+            return
+
+        elif message.id in self._outstanding:
+            self._timeouts.cancel(message.id)
+
+            # set exception if receive error message
+            if message.message_type == Types.ERROR:
+                future = self._outstanding.pop(message.id)
+                if future.running():
+                    error = TChannelError.from_code(
+                        message.code,
+                        description=message.description,
+                    )
+                    future.set_exception(error)
                 else:
-                    future = self._outstanding.pop(message.id)
+                    protocol_exception = (
+                        self.response_message_factory.build(message)
+                    )
+                    if protocol_exception:
+                        self.event_emitter.fire(
+                            EventType.after_receive_error,
+                            protocol_exception,
+                        )
+                return
 
-                if response and future.running():
-                    future.set_result(response)
-                continue
+            response = self.response_message_factory.build(message)
+
+            # keep continue message in the list
+            # pop all other type messages including error message
+            if (message.message_type in self.CALL_RES_TYPES and
+                    message.flags == FlagsType.fragment):
+                # still streaming, keep it for record
+                future = self._outstanding.get(message.id)
+            else:
+                future = self._outstanding.pop(message.id)
 
-            log.warn('Unconsumed message %s', message)
+            if response and future.running():
+                future.set_result(response)
+            return
+
+        log.warn('Unconsumed message %s', message)
+
+    def _handle_cancel(self, message):
+        """Stop serving the incoming call the given CancelMessage refers to.
+
+        Marks the request and response cancelled. Handlers can check
+        ``request.cancelled`` to give up early, and no more fragments of the
+        response are written.
+        """
+        log.debug('Call %d was cancelled: %s', message.id, message.why)
+
+        # Drop the fragments of a request that's still streaming in,
+        # including the ones that are still on their way.
+        factory = self.request_message_factory
+        if message.id in factory.message_buffer:
+            factory.remove_buffer(message.id)
+            self._cancelled_calls.add(message.id)
+
+        call = self.incoming_calls.get(message.id)
+        if call is None:
+            # Already done
+            return
+
+        request, response = call
+        request.cancelled = True
+        response.cancelled = True
+
+        # Fail the handler's reads instead of letting them see a truncated
+        # body.
+        request.set_exception(CanceledError())
+
+    def _expire_requests(self, message_ids):
+        """Fail the outstanding requests whose TTL ran out.
+
+        The requests stay in the pending request list so that late responses
+        for them are still recognized.
+        """
+        for message_id in message_ids:
+            future = self._outstanding.get(message_id)
+            if future is not None and future.running():
+                future.set_exception(TimeoutError())
 
     # Basically, the only difference between send and write is that send
     # sets up a Future to get the response. That's ideal for peers making
@@ -303,33 +499,71 @@ class TornadoConnection(object):
         else:
             message_factory = self.response_message_factory
 
-        fragments = message_factory.fragment(message)
-
-        return chain(fragments, self._write)
+        # Queue up all fragments right away so that they go out in as few
+        # writes as possible.
+        future = None
+        for fragment in message_factory.fragment(message):
+            future = self._write(fragment)
+        return future
 
     def _write(self, message):
         """Writes the given message up the wire.
 
-        The message must be small enough to fit in a single frame.
+        The message must be small enough to fit in a single frame. It is
+        buffered and written along with all other frames written during the
+        same IOLoop iteration.
+
+        :returns:
+            A Future that resolves once the frame has been written.
         """
         message.id = message.id or self.next_message_id()
 
-        payload = messages.RW[message.message_type].write(
-            message, BytesIO()
-        ).getvalue()
-
-        f = frame.Frame(
-            header=frame.FrameHeader(
+        # Serialize the frame straight into the write buffer.
+        frame.frame_rw.write_message(
+            frame.FrameHeader(
                 message_type=message.message_type,
                 message_id=message.id,
             ),
-            payload=payload
+            messages.RW[message.message_type],
+            message,
+            self._write_buffer,
         )
-        body = frame.frame_rw.write(f, BytesIO()).getvalue()
+        self._write_buffer_frames += 1
+
+        future = self._write_future
+        if future is None:
+            future = self._write_future = tornado.gen.Future()
+            tornado.ioloop.IOLoop.current().add_callback(self._flush)
+
+        if self._write_buffer.tell() >= self.write_high_water_mark:
+            self._flush()
+
+        return future
+
+    def _flush(self):
+        """Write all buffered frames to the socket in a single write."""
+        future = self._write_future
+        if future is None:
+            # Already flushed because we hit the high water mark.
+            return
+
+        self.last_activity = tornado.ioloop.IOLoop.current().time()
+
+        data = self._write_buffer.getvalue()
+        self.frames_per_flush[self._write_buffer_frames] += 1
+        self._write_buffer = BytesIO()
+        self._write_buffer_frames = 0
+        self._write_future = None
 
-        return self.connection.write(body)
+        try:
+            write_future = self.connection.write(data)
+        except tornado.iostream.StreamClosedError as e:
+            future.set_exception(e)
+        else:
+            tornado.concurrent.chain_future(write_future, future)
 
     def close(self):
+        self._flush()
         self.connection.close()
 
     @tornado.gen.coroutine
@@ -463,6 +697,8 @@ class TornadoConnection(object):
 
         while not self.closed:
             message = yield self.await()
+            if self._is_cancelled_fragment(message):
+                continue
 
             try:
                 handler(message, self)
@@ -470,6 +706,21 @@ class TornadoConnection(object):
                 # TODO Send error frame back
                 logging.exception("Failed to process %s", repr(message))
 
+    def _is_cancelled_fragment(self, message):
+        """Whether the message is a fragment of a cancelled incoming call."""
+        if message.id not in self._cancelled_calls:
+            return False
+
+        if message.message_type != Types.CALL_REQ_CONTINUE:
+            # The ID is being reused for a new call.
+            self._cancelled_calls.discard(message.id)
+            return False
+
+        if not message.flags & FlagsType.fragment:
+            # That was the last one.
+            self._cancelled_calls.discard(message.id)
+        return True
+
     def send_error(self, code, description, message_id):
         """Convenience method for writing Error frames up the wire.
 
@@ -542,6 +793,27 @@ class StreamConnection(TornadoConnection):
 
         :param context: Request or Response object
         """
+        if all(
+            isinstance(argstream, InMemStream) and
+            argstream.state == StreamState.completed and
+            not argstream.exception
+            for argstream in context.argstreams
+        ):
+            # Fast path: every arg is already in memory, so build the whole
+            # message at once. write() fragments it if it's too large.
+            if context.cancelled:
+                log.info("Stop Outgoing Streams because %d was cancelled",
+                         context.id)
+                return
+            args = [
+                argstream.read_nowait() for argstream in context.argstreams
+            ]
+            message = (message_factory.
+                       build_raw_message(context, args, is_completed=True))
+            yield self.write(message)
+            context.state = StreamState.completed
+            return
+
         args = []
         try:
             for argstream in context.argstreams:
@@ -549,13 +821,25 @@ class StreamConnection(TornadoConnection):
                 args.append(chunk)
                 chunk = yield argstream.read()
                 while chunk:
+                    if context.cancelled:
+                        log.info("Stop Outgoing Streams because %d was "
+                                 "cancelled", context.id)
+                        return
                     message = (message_factory.
                                build_raw_message(context, args))
+                    # This resolves once the frame has drained from the
+                    # socket's write buffer. Waiting for it before reading
+                    # the next chunk keeps a fast producer from piling up
+                    # data in memory.
                     yield self.write(message)
                     args = [chunk]
                     chunk = yield argstream.read()
 
             # last piece of request/response.
+            if context.cancelled:
+                log.info("Stop Outgoing Streams because %d was cancelled",
+                         context.id)
+                return
             message = (message_factory.
                        build_raw_message(context, args, is_completed=True))
             yield self.write(message)
@@ -577,6 +861,7 @@ class StreamConnection(TornadoConnection):
                 response,
             )
         finally:
+            self.incoming_calls.pop(response.id, None)
             response.close_argstreams(force=True)
 
     def stream_request(self, request):
@@ -611,6 +896,8 @@ class StreamConnection(TornadoConnection):
 
         future = tornado.gen.Future()
         self._outstanding[request.id] = future
+        if request.ttl:
+            self._timeouts.add(request.id, request.ttl)
         self.stream_request(request)
 
         # the actual future that caller will yield
@@ -637,6 +924,43 @@ class StreamConnection(TornadoConnection):
             response.tracing = request.tracing
             response_future.set_result(response)
 
+    def cancel_request(self, request, why=None):
+        """Ask the other side to stop working on the given request.
+
+        Does nothing if the request isn't outstanding anymore, for example
+        because an error was already received for it.
+
+        :param request:
+            Request that the caller gave up on
+        :param why:
+            Reason for the cancellation
+        :returns:
+            A Future that resolves once the CANCEL frame has been written, or
+            None if none was written
+        """
+        if self.closed or request.id not in self._outstanding:
+            return None
+
+        return self._write(
+            messages.CancelMessage(
+                ttl=request.ttl * 1000,
+                tracing=messages.Tracing(
+                    request.tracing.span_id,
+                    request.tracing.parent_span_id,
+                    request.tracing.trace_id,
+                    request.tracing.traceflags,
+                ),
+                why=why,
+                id=request.id,
+            ),
+        )
+
     def remove_outstanding_request(self, request):
-        """Remove request from pending request list"""
-        self._outstanding.pop(request.id, None)
+        """Remove request from pending request list
+
+        Anyone still waiting for the response gets a ``CanceledError``.
+        """
+        future = self._outstanding.pop(request.id, None)
+        self._timeouts.cancel(request.id)
+        if future is not None and future.running():
+            future.set_exception(CanceledError())
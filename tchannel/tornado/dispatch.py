@@ -25,9 +25,11 @@ from collections import namedtuple
 
 import tornado
 import tornado.gen
+import tornado.ioloop
 from tornado import gen
 
 from tchannel import transport
+from tchannel.status import OK
 from tchannel.request import Request
 from tchannel.request import TransportHeaders
 from tchannel.response import response_from_mixed
@@ -39,11 +41,19 @@ from ..messages import Types
 from ..messages.error import ErrorCode
 from ..serializer.raw import RawSerializer
 from .response import Response as DeprecatedResponse
+from .stream import ChunkIterator
+from .stream import InMemStream
+from .stream import Stream
+from .stream import maybe_stream
+from .stream import read_full
+from .util import get_arg
 
 log = logging.getLogger('tchannel')
 
 
-Handler = namedtuple('Handler', 'endpoint req_serializer resp_serializer')
+Handler = namedtuple(
+    'Handler', 'endpoint req_serializer resp_serializer streaming cache'
+)
 
 
 class RequestDispatcher(object):
@@ -64,14 +74,18 @@ class RequestDispatcher(object):
 
     FALLBACK = object()
 
+    # Bytes of a streaming handler's response body that may be buffered
+    # before the handler has to wait for them to be sent.
+    streaming_buffer_size = 1024 * 1024
+
     def __init__(self, _handler_returns_response=False):
         self.handlers = {}
-        self.register(self.FALLBACK, self.not_found)
         self._handler_returns_response = _handler_returns_response
+        self.register(self.FALLBACK, self.not_found)
 
     _HANDLER_NAMES = {
         Types.CALL_REQ: 'pre_call',
-        Types.CALL_REQ_CONTINUE: 'pre_call'
+        Types.CALL_REQ_CONTINUE: 'pre_call',
     }
 
     def handle(self, message, connection):
@@ -126,11 +140,8 @@ class RequestDispatcher(object):
         # NOTE: after here, the correct way to access value of arg_1 is through
         # request.endpoint. The original argstream[0] is no longer valid. If
         # user still tries read from it, it will return empty.
-        chunk = yield request.argstreams[0].read()
+        request.endpoint = yield read_full(request.argstreams[0])
         response = None
-        while chunk:
-            request.endpoint += chunk
-            chunk = yield request.argstreams[0].read()
 
         log.debug('Received a call to %s.', request.endpoint)
 
@@ -169,47 +180,33 @@ class RequestDispatcher(object):
             serializer=handler.resp_serializer,
         )
 
+        connection.incoming_calls[request.id] = (request, response)
         connection.post_response(response)
 
         try:
             # New impl - the handler takes a request and returns a response
             if self._handler_returns_response:
 
-                # convert deprecated req to new top-level req
-                b = yield request.get_body()
-                he = yield request.get_header()
-                t = request.headers
-                t = transport.to_kwargs(t)
-                t = TransportHeaders(**t)
-                new_req = Request(
-                    body=b,
-                    headers=he,
-                    transport=t,
-                    endpoint=request.endpoint,
-                )
-
-                # Not safe to have coroutine yields statement within
-                # stack context.
-                # The right way to do it is:
-                # with request_context(..):
-                #    future = f()
-                # yield future
-
-                with request_context(request.tracing):
-                    f = handler.endpoint(new_req)
-
-                new_resp = yield gen.maybe_future(f)
-
-                # instantiate a tchannel.Response
-                new_resp = response_from_mixed(new_resp)
-
-                response.code = new_resp.status
-
-                # assign resp values to dep response
-                response.write_header(new_resp.headers)
-
-                if new_resp.body is not None:
-                    response.write_body(new_resp.body)
+                cache_key = cached = None
+                if handler.cache is not None:
+                    raw_header = yield get_arg(request, 1)
+                    raw_body = yield get_arg(request, 2)
+                    cache_key = (request.endpoint, raw_header, raw_body)
+                    cached = handler.cache.get(cache_key, self._now())
+
+                    # event: on_cache_hit, on_cache_miss
+                    tchannel.event_emitter.fire(
+                        EventType.on_cache_hit if cached is not None
+                        else EventType.on_cache_miss,
+                        request,
+                    )
+
+                if cached is not None:
+                    self._write_serialized(response, *cached)
+                else:
+                    yield self._call_handler(
+                        handler, request, response, cache_key
+                    )
 
             # Dep impl - the handler is provided with a req & resp writer
             else:
@@ -220,6 +217,11 @@ class RequestDispatcher(object):
 
             response.flush()
         except TChannelError as e:
+            # Nothing more is written for this call, so don't leave it
+            # in flight.
+            connection.incoming_calls.pop(request.id, None)
+            response.set_exception(e)
+
             connection.send_error(
                 e.code,
                 e.message,
@@ -229,6 +231,7 @@ class RequestDispatcher(object):
             msg = "An unexpected error has occurred from the handler"
             log.exception(msg)
 
+            connection.incoming_calls.pop(request.id, None)
             response.set_exception(TChannelError(e.message))
             connection.request_message_factory.remove_buffer(response.id)
 
@@ -237,12 +240,119 @@ class RequestDispatcher(object):
 
         raise gen.Return(response)
 
+    @gen.coroutine
+    def _call_handler(self, handler, request, response, cache_key=None):
+        """Call a handler that returns a response and write the response.
+
+        :param cache_key:
+            If given, the request's raw ``(endpoint, header, body)``. A
+            successful response is stored in the handler's cache under it.
+        """
+        # convert deprecated req to new top-level req
+        if cache_key is not None:
+            _, raw_header, raw_body = cache_key
+            he = request.serializer.deserialize_header(raw_header)
+            b = request.serializer.deserialize_body(raw_body)
+        else:
+            he = yield request.get_header()
+            if handler.streaming:
+                b = ChunkIterator(request.get_body_s())
+            else:
+                b = yield request.get_body()
+        t = request.headers
+        t = transport.to_kwargs(t)
+        t = TransportHeaders(**t)
+        new_req = Request(
+            body=b,
+            headers=he,
+            transport=t,
+            endpoint=request.endpoint,
+        )
+
+        # Not safe to have coroutine yields statement within
+        # stack context.
+        # The right way to do it is:
+        # with request_context(..):
+        #    future = f()
+        # yield future
+
+        with request_context(request.tracing):
+            f = handler.endpoint(new_req)
+
+        new_resp = yield gen.maybe_future(f)
+
+        # instantiate a tchannel.Response
+        new_resp = response_from_mixed(new_resp)
+
+        if cache_key is not None and new_resp.status == OK:
+            # Keep the serialized response so that hits don't have to
+            # serialize it again.
+            serializer = handler.resp_serializer
+            serialized = (
+                new_resp.status,
+                serializer.serialize_header(new_resp.headers),
+                serializer.serialize_body(new_resp.body)
+                if new_resp.body is not None else None,
+            )
+            handler.cache.set(cache_key, serialized, self._now())
+            self._write_serialized(response, *serialized)
+            return
+
+        response.code = new_resp.status
+
+        # assign resp values to dep response
+        response.write_header(new_resp.headers)
+
+        if handler.streaming:
+            yield self._write_streaming_body(response, new_resp.body)
+        elif new_resp.body is not None:
+            response.write_body(new_resp.body)
+
+    @staticmethod
+    def _now():
+        return tornado.ioloop.IOLoop.current().time()
+
+    @staticmethod
+    def _write_serialized(response, code, header, body):
+        """Fill in the response with an already serialized header and body.
+        """
+        response.code = code
+        response.set_header_s(maybe_stream(header))
+        response.set_body_s(maybe_stream(body))
+
+    @gen.coroutine
+    def _write_streaming_body(self, response, body):
+        """Write the body returned by a streaming handler.
+
+        :param body:
+            A string, a ``Stream``, or an iterable of chunks or futures for
+            chunks.
+        """
+        if body is None:
+            return
+
+        if isinstance(body, Stream):
+            response.set_body_s(body)
+        elif isinstance(body, basestring):
+            response.write_body(body)
+        else:
+            response.set_body_s(
+                InMemStream(max_size=self.streaming_buffer_size)
+            )
+            for chunk in body:
+                chunk = yield gen.maybe_future(chunk)
+                # Wait for room in the body stream so that chunks aren't
+                # produced faster than they can be sent.
+                yield response.write_body(chunk)
+
     def register(
             self,
             rule,
             handler,
             req_serializer=None,
-            resp_serializer=None
+            resp_serializer=None,
+            streaming=False,
+            cache=None,
     ):
         """Register a new endpoint with the given name.
 
@@ -270,12 +380,37 @@ class RequestDispatcher(object):
         :param resp_serializer:
             Arg scheme serializer of this endpoint. It should be
             ``RawSerializer``, ``JsonSerializer``, and ``ThriftSerializer``.
+
+        :param streaming:
+            If True, the request body is given to the handler as a
+            ``ChunkIterator`` instead of being read in full, and the handler
+            may return a ``Stream`` or an iterable of chunks (or futures for
+            chunks) as the response body. This only applies to handlers that
+            return responses.
+
+        :param cache:
+            An ``LRUCache``. If given, successful responses are cached by
+            endpoint, header and body of the request, and requests that are
+            already in the cache are answered without calling the handler.
+            Only use this for idempotent endpoints, and only with handlers
+            that return responses.
         """
 
         assert handler, "handler must not be None"
+        assert not (streaming and cache is not None), (
+            "streaming endpoints can't be cached"
+        )
+        assert self._handler_returns_response or not streaming, (
+            "only handlers that return responses can be streaming"
+        )
+        assert self._handler_returns_response or cache is None, (
+            "only handlers that return responses can be cached"
+        )
         req_serializer = req_serializer or RawSerializer()
         resp_serializer = resp_serializer or RawSerializer()
-        self.handlers[rule] = Handler(handler, req_serializer, resp_serializer)
+        self.handlers[rule] = Handler(
+            handler, req_serializer, resp_serializer, streaming, cache
+        )
 
     @staticmethod
     def not_found(request, response=None):
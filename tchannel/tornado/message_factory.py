@@ -169,6 +169,16 @@ class MessageFactory(object):
             return self.build_raw_response_message(reqres, args, is_completed)
 
     def prepare_args(self, message):
+        if message.flags == FlagsType.none:
+            # The whole message is here. Hand the args over as completed
+            # streams without any fragment bookkeeping.
+            args = [InMemStream(arg, auto_close=False) for arg in message.args]
+            while len(args) < 3:
+                args.append(InMemStream(auto_close=False))
+            for arg in args:
+                arg.close()
+            return args
+
         args = [
             InMemStream(auto_close=False),
             InMemStream(auto_close=False),
@@ -261,6 +271,10 @@ class MessageFactory(object):
             self.verify_message(message)
 
             context = self.build_context(message)
+            if message.flags == FlagsType.none:
+                # unfragmented message, prepare_args closed every arg
+                return context
+
             # streaming message
             if message.flags == common.FlagsType.fragment:
                 self.message_buffer[message.id] = context
@@ -22,30 +22,44 @@ from __future__ import (
     absolute_import, division, print_function, unicode_literals
 )
 
+import hashlib
 import logging
+import math
+import struct
+from bisect import bisect
 from collections import deque
+from datetime import timedelta
 from itertools import chain
+from random import choice
 from random import random
 
 from tornado import gen
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+from tornado.ioloop import PeriodicCallback
 
 from ..schemes import DEFAULT as DEFAULT_SCHEME
 from ..retry import (
     DEFAULT as DEFAULT_RETRY, DEFAULT_RETRY_LIMIT
 )
+from ..transport import SHARD_KEY
 from tchannel.event import EventType
 from tchannel.glossary import DEFAULT_TIMEOUT
 from ..context import get_current_context
+from ..errors import CanceledError
+from ..errors import NetworkError
 from ..errors import NoAvailablePeerError
 from ..errors import TChannelError
+from ..errors import TimeoutError
 from ..zipkin.annotation import Endpoint
 from ..zipkin.trace import Trace
+from .breaker import CircuitBreaker
+from .breaker import PEER_FAILURES
 from .connection import StreamConnection
 from .request import Request
 from .stream import InMemStream
 from .stream import read_full
 from .stream import maybe_stream
-from .timeout import timeout
 
 try:
     # included in Tornado 4.2
@@ -55,6 +69,14 @@ except ImportError:  # pragma: no cover
 
 log = logging.getLogger('tchannel')
 
+# Default bounds on the number of outgoing connections made to a Peer.
+DEFAULT_MIN_CONNECTIONS = 1
+DEFAULT_MAX_CONNECTIONS = 1
+
+# Default number of outstanding requests on the least loaded connection of a
+# Peer at which another outgoing connection is made to it.
+DEFAULT_GROW_THRESHOLD = 100
+
 
 class PeerGroup(object):
     """A PeerGroup represents a collection of Peers.
@@ -63,7 +85,13 @@ class PeerGroup(object):
     or a peer chosen at random.
     """
 
-    def __init__(self, tchannel, score_threshold=None):
+    def __init__(self, tchannel, score_threshold=None,
+                 min_connections=DEFAULT_MIN_CONNECTIONS,
+                 max_connections=DEFAULT_MAX_CONNECTIONS,
+                 grow_threshold=DEFAULT_GROW_THRESHOLD,
+                 idle_timeout=None,
+                 chooser=None,
+                 scorer=None):
         """Initializes a new PeerGroup.
 
         :param tchannel:
@@ -72,14 +100,53 @@ class PeerGroup(object):
             A value in the ``[0, 1]`` range. If specifiede, this requires that
             chosen peers havea score higher than this value when performing
             requests.
+        :param min_connections:
+            Number of connections each Peer in this group keeps open once
+            it's been used.
+        :param max_connections:
+            Maximum number of outgoing connections each Peer in this group
+            will make.
+        :param grow_threshold:
+            Number of outstanding requests on the least loaded connection of
+            a Peer at which it makes another outgoing connection.
+        :param idle_timeout:
+            If specified, connections that have had no calls in flight and no
+            traffic for this many seconds are closed.
+        :param chooser:
+            PeerChooser used to pick peers for requests. Defaults to a
+            HighestScoreChooser.
+        :param scorer:
+            PeerScorer used to rank peers for requests. Defaults to a
+            StateScorer.
         """
         self.tchannel = tchannel
+        self.chooser = chooser or HighestScoreChooser()
+        self.scorer = scorer or StateScorer()
 
         self._score_threshold = score_threshold
 
+        self._min_connections = min_connections
+        self._max_connections = max_connections
+        self._grow_threshold = grow_threshold
+
+        self._idle_timeout = idle_timeout
+
+        # PeriodicCallback that closes idle connections. Like the reset
+        # Condition, it's only started once the group is actually used.
+        self._reaper = None
+
         # Dictionary from hostport to Peer.
         self._peers = {}
 
+        # Peers split up by whether they're connected. These are kept up to
+        # date as connections come and go so that choosers don't need to
+        # look at every peer.
+        self.connected_peers = PeerSet()
+        self.unconnected_peers = PeerSet()
+
+        # Incremented whenever peers are added or removed.
+        self.generation = 0
+
         # Notified when a reset is performed. This allows multiple coroutines
         # to block on the same reset.
         self._resetting = False
@@ -113,11 +180,19 @@ class PeerGroup(object):
         if self._reset_condition is None:
             self._reset_condition = Condition()
 
+        if self._reaper is not None:
+            self._reaper.stop()
+            self._reaper = None
+
         try:
             for peer in self._peers.values():
+                peer.on_connection_change = None
                 peer.close()
         finally:
             self._peers = {}
+            self.connected_peers = PeerSet()
+            self.unconnected_peers = PeerSet()
+            self.generation += 1
             self._resetting = False
             self._reset_condition.notify_all()
 
@@ -128,10 +203,49 @@ class PeerGroup(object):
         given host-port. Otherwise, the existing Peer is returned.
         """
         assert hostport, "hostport is required"
+        if self._idle_timeout and self._reaper is None:
+            self._start_reaper()
         if hostport not in self._peers:
-            self._peers[hostport] = Peer(self.tchannel, hostport)
+            self._add(self._new_peer(hostport))
         return self._peers[hostport]
 
+    def _start_reaper(self):
+        # Check twice per timeout so that idle connections don't stay open
+        # for much longer than that.
+        self._reaper = PeriodicCallback(
+            self._reap_idle_connections, self._idle_timeout * 1000 / 2
+        )
+        self._reaper.start()
+
+    def _reap_idle_connections(self):
+        idle_since = IOLoop.current().time() - self._idle_timeout
+        for peer in self._peers.values():
+            peer.close_idle_connections(idle_since)
+
+    def _add(self, peer):
+        self._peers[peer.hostport] = peer
+        self.generation += 1
+        peer.on_connection_change = self._update_index
+        self._update_index(peer)
+
+    def _update_index(self, peer):
+        """Move the given peer to the right side of the peer index."""
+        if peer.connected:
+            self.unconnected_peers.discard(peer)
+            self.connected_peers.add(peer)
+        else:
+            self.connected_peers.discard(peer)
+            self.unconnected_peers.add(peer)
+
+    def _new_peer(self, hostport):
+        return Peer(
+            self.tchannel,
+            hostport,
+            min_connections=self._min_connections,
+            max_connections=self._max_connections,
+            grow_threshold=self._grow_threshold,
+        )
+
     def lookup(self, hostport):
         """Look up a Peer for the given host and port.
 
@@ -148,7 +262,13 @@ class PeerGroup(object):
         :returns: The removed Peer
         """
         assert hostport, "hostport is required"
-        return self._peers.pop(hostport, None)
+        peer = self._peers.pop(hostport, None)
+        if peer is not None:
+            self.generation += 1
+            peer.on_connection_change = None
+            self.connected_peers.discard(peer)
+            self.unconnected_peers.discard(peer)
+        return peer
 
     def add(self, peer):
         """Add an existing Peer to this group.
@@ -159,13 +279,13 @@ class PeerGroup(object):
 
         if isinstance(peer, basestring):
             # Assume strings are host-ports
-            peer = Peer(self.tchannel, peer)
+            peer = self._new_peer(peer)
 
         assert peer.hostport not in self._peers, (
             "%s already has a peer" % peer.hostport
         )
 
-        self._peers[peer.hostport] = peer
+        self._add(peer)
 
     @property
     def hosts(self):
@@ -195,10 +315,14 @@ class PeerGroup(object):
             hostport=hostport,
             **kwargs)
 
-    def choose(self, hostport=None, score_threshold=None, blacklist=None):
+    def choose(self, hostport=None, score_threshold=None, blacklist=None,
+               scorer=None, shard_key=None):
         """Choose a Peer that matches the given criteria.
 
-        The Peer with the highest score will be chosen.
+        Which of the matching Peers is chosen is up to the PeerChooser of
+        this group. By default, the Peer with the highest score is chosen.
+        Peers whose circuit breaker is open are never chosen unless
+        ``hostport`` asks for them.
 
         :param hostport:
             Specifies that the returned Peer must be for the given host-port.
@@ -210,6 +334,12 @@ class PeerGroup(object):
             initialized.
         :param blacklist:
             Peers on the blacklist won't be chosen.
+        :param scorer:
+            PeerScorer used to rank the candidates. Defaults to the scorer
+            specified when the PeerGroup was initialized.
+        :param shard_key:
+            Shard key of the request, if any. Choosers may use this to send
+            requests for the same key to the same Peer.
         :returns:
             A Peer that matches all the requested criteria or None if no such
             Peer was found.
@@ -220,22 +350,425 @@ class PeerGroup(object):
             return self.get(hostport)
 
         score_threshold = score_threshold or self._score_threshold or 0
-        chosen_peer = None
-        chosen_score = 0
-        hosts = self._peers.viewkeys() - blacklist
+        scorer = scorer or self.scorer
+        peer = self.chooser.choose(
+            self, scorer, score_threshold, blacklist, shard_key
+        )
+        if peer is not None:
+            # Don't let other requests probe the peer while this one is
+            # connecting.
+            peer.breaker.reserve_probe(IOLoop.current().time())
+        return peer
+
+
+class PeerScorer(object):
+    """Ranks Peers for a PeerChooser. Peers with higher scores are better."""
+
+    __slots__ = ()
+
+    def score(self, peer):
+        """Calculate the score of the given Peer."""
+        raise NotImplementedError()
+
+
+class StateScorer(PeerScorer):
+    """Scores Peers based on their PeerState."""
+
+    __slots__ = ()
+
+    def score(self, peer):
+        return peer.state.score()
+
+
+class LeastPendingScorer(PeerScorer):
+    """Prefers Peers with fewer outstanding requests.
+
+    Connected peers have a score in the range ``(0.2, 1.0]`` that goes down
+    as requests to them back up. Peers with the same number of outstanding
+    requests are ordered randomly but always rank above peers with more.
+    Unconnected peers have a score in the range ``[0.1, 0.2)``.
+    """
+
+    __slots__ = ()
+
+    def score(self, peer):
+        if not peer.connected:
+            return 0.1 + random() * 0.1
+
+        return 0.2 + 0.8 / (1 + peer.outstanding_requests + random())
+
+
+class EWMAScorer(PeerScorer):
+    """Prefers Peers that have been responding quickly and successfully.
+
+    Connected peers are ranked by the moving averages of response latency
+    and error rate kept in their PeerStats, weighed by the number of
+    requests already outstanding to them so that a fast peer doesn't get
+    swamped. Connected peers have a score in the range ``[0.2, 1.0]`` and
+    unconnected peers have a score in the range ``[0.1, 0.2)``.
+
+    Since the averages decay back to their defaults when a peer isn't used,
+    peers that were slow a while ago are tried again eventually.
+    """
+
+    __slots__ = ()
+
+    def score(self, peer):
+        if not peer.connected:
+            return 0.1 + random() * 0.1
+
+        now = IOLoop.current().time()
+        stats = peer.stats
+
+        # Expected milliseconds until a new request is served.
+        cost = stats.latency(now) * 1000 * (1 + peer.outstanding_requests)
+        return 0.2 + 0.8 * (1 - stats.error_rate(now)) / (1 + cost + random())
+
+
+class PeerStats(object):
+    """Moving averages of the response latency and error rate of a Peer.
+
+    Each response moves the averages ``alpha`` of the way towards its
+    latency and outcome. Between responses, the averages decay back towards
+    ``default_latency`` and ``default_error_rate`` with a time constant of
+    ``decay_time`` seconds. Peers without any responses yet are assumed to
+    have those defaults too, so neither an unknown nor a stale peer looks
+    better than one that has been responding quickly.
+    """
+
+    __slots__ = (
+        'alpha',
+        'decay_time',
+        'default_latency',
+        'default_error_rate',
+
+        '_latency',
+        '_error_rate',
+        '_updated_at',
+    )
+
+    def __init__(self, alpha=0.3, decay_time=10.0, default_latency=0.1,
+                 default_error_rate=0.0):
+        self.alpha = alpha
+        self.decay_time = decay_time
+        self.default_latency = default_latency
+        self.default_error_rate = default_error_rate
+
+        self._latency = default_latency
+        self._error_rate = default_error_rate
+        self._updated_at = None
+
+    def _decay(self, now):
+        if self._updated_at is None:
+            return 0.0
+        return math.exp(-max(now - self._updated_at, 0) / self.decay_time)
+
+    def latency(self, now):
+        """Average response latency in seconds as of the given time."""
+        default = self.default_latency
+        return default + (self._latency - default) * self._decay(now)
+
+    def error_rate(self, now):
+        """Fraction of recent requests that failed as of the given time."""
+        default = self.default_error_rate
+        return default + (self._error_rate - default) * self._decay(now)
+
+    def _record(self, now, latency, error):
+        alpha = self.alpha
+        self._latency = (1 - alpha) * self.latency(now) + alpha * latency
+        self._error_rate = (
+            (1 - alpha) * self.error_rate(now) + alpha * error
+        )
+        self._updated_at = now
+
+    def record_response(self, now, latency):
+        """Record a successful response.
+
+        :param now:
+            IOLoop time at which the response was received
+        :param latency:
+            Seconds it took for the response to arrive
+        """
+        self._record(now, latency, 0)
+
+    def record_error(self, now, latency):
+        """Record a failed request.
+
+        :param now:
+            IOLoop time at which the request failed
+        :param latency:
+            Seconds it took for the request to fail
+        """
+        self._record(now, latency, 1)
+
+
+class PeerSet(object):
+    """A set of Peers that supports picking a random member in O(1)."""
+
+    __slots__ = ('_peers', '_positions')
+
+    def __init__(self):
+        self._peers = []
+
+        # Map from Peer to its position in _peers.
+        self._positions = {}
+
+    def __len__(self):
+        return len(self._peers)
+
+    def __contains__(self, peer):
+        return peer in self._positions
+
+    def __iter__(self):
+        return iter(self._peers)
+
+    def add(self, peer):
+        if peer not in self._positions:
+            self._positions[peer] = len(self._peers)
+            self._peers.append(peer)
+
+    def discard(self, peer):
+        position = self._positions.pop(peer, None)
+        if position is None:
+            return
+
+        # Fill the hole with the last peer so that removal is O(1).
+        last = self._peers.pop()
+        if last is not peer:
+            self._peers[position] = last
+            self._positions[last] = position
+
+    def random(self):
+        """Return a random Peer from this set."""
+        return choice(self._peers)
+
+
+class PeerChooser(object):
+    """Decides which Peer of a PeerGroup a request is sent to."""
+
+    __slots__ = ()
+
+    def choose(self, peer_group, scorer, score_threshold, blacklist,
+               shard_key=None):
+        """Choose a Peer from the given group.
+
+        :param peer_group:
+            PeerGroup to choose from
+        :param scorer:
+            PeerScorer used to rank Peers
+        :param score_threshold:
+            Peers with a score equal to or below this must not be chosen.
+        :param blacklist:
+            Set of host-ports that must not be chosen.
+        :param shard_key:
+            Shard key of the request, if any.
+        :returns:
+            The chosen Peer or None if no Peer is eligible.
+        """
+        raise NotImplementedError()
+
+
+class HighestScoreChooser(PeerChooser):
+    """Chooses the Peer with the highest score.
+
+    This scores every Peer in the group on every request.
+    """
+
+    __slots__ = ()
+
+    def choose(self, peer_group, scorer, score_threshold, blacklist,
+               shard_key=None):
+        return _highest_score(
+            peer_group.peers, scorer, score_threshold, blacklist
+        )
+
+
+class TwoChoicesChooser(PeerChooser):
+    """Chooses the better of two random Peers.
+
+    Connected Peers are always preferred over Peers that would require a new
+    connection. Only two Peers are scored per request so the cost of a choice
+    does not depend on the size of the group. If neither of the candidates
+    is eligible, all Peers are scored instead.
+    """
+
+    __slots__ = ()
+
+    def choose(self, peer_group, scorer, score_threshold, blacklist,
+               shard_key=None):
+        for peers in (peer_group.connected_peers,
+                      peer_group.unconnected_peers):
+            if not peers:
+                continue
+
+            candidates = (peers.random(), peers.random())
+            peer = _highest_score(
+                candidates, scorer, score_threshold, blacklist
+            )
+            if peer is None:
+                peer = _highest_score(
+                    peers, scorer, score_threshold, blacklist
+                )
+            if peer is not None:
+                return peer
+
+        return None
+
+
+class ConsistentHashChooser(PeerChooser):
+    """Sends requests with the same shard key to the same Peer.
+
+    Every Peer is placed on a hash ring ``replicas`` times. A request goes
+    to the first eligible Peer clockwise from the hash of its shard key, so
+    only the keys of Peers that join or leave the group move elsewhere.
+
+    A Peer is passed over for the next one on the ring if taking the request
+    would put it above ``load_factor`` times the average number of
+    outstanding requests per Peer. This keeps hot keys from overloading a
+    single Peer.
+
+    Requests without a shard key are left to ``fallback``, which defaults to
+    a HighestScoreChooser.
+    """
+
+    __slots__ = (
+        'replicas',
+        'load_factor',
+        'fallback',
+
+        '_group',
+        '_generation',
+        '_hashes',
+        '_ring',
+        '_num_peers',
+    )
+
+    def __init__(self, replicas=20, load_factor=1.25, fallback=None):
+        self.replicas = replicas
+        self.load_factor = load_factor
+        self.fallback = fallback or HighestScoreChooser()
+
+        # The ring is rebuilt whenever the PeerGroup it was built for
+        # changes.
+        self._group = None
+        self._generation = None
+
+        # Sorted hashes of the points on the ring and the Peer at each.
+        self._hashes = []
+        self._ring = []
+        self._num_peers = 0
+
+    def _build_ring(self, peer_group):
+        peers = peer_group.peers
+        points = sorted(
+            (_hash('%s-%d' % (peer.hostport, i)), peer)
+            for peer in peers
+            for i in xrange(self.replicas)
+        )
+        self._hashes = [h for h, _ in points]
+        self._ring = [peer for _, peer in points]
+        self._num_peers = len(peers)
+        self._group = peer_group
+        self._generation = peer_group.generation
+
+    def choose(self, peer_group, scorer, score_threshold, blacklist,
+               shard_key=None):
+        if not shard_key:
+            return self.fallback.choose(
+                peer_group, scorer, score_threshold, blacklist
+            )
+
+        if (self._group is not peer_group or
+                self._generation != peer_group.generation):
+            self._build_ring(peer_group)
 
-        for host in hosts:
-            peer = self.get(host)
-            score = peer.state.score()
+        num_points = len(self._ring)
+        start = bisect(self._hashes, _hash(shard_key))
+        now = IOLoop.current().time()
+        capacity = None
+        seen = set()
+        first_eligible = None
 
-            if score <= score_threshold:
+        for i in xrange(num_points):
+            peer = self._ring[(start + i) % num_points]
+            if peer in seen:
                 continue
+            seen.add(peer)
+
+            if peer.hostport in blacklist:
+                continue
+            if not peer.breaker.available(now):
+                continue
+            if scorer.score(peer) <= score_threshold:
+                continue
+
+            load = peer.outstanding_requests
+            if not load:
+                return peer
+
+            if capacity is None:
+                total = sum(
+                    p.outstanding_requests for p in peer_group.connected_peers
+                )
+                capacity = math.ceil(
+                    self.load_factor * (total + 1) / self._num_peers
+                )
+            if load + 1 <= capacity:
+                return peer
+
+            first_eligible = first_eligible or peer
+
+        # Everyone is overloaded. Stick with the usual Peer.
+        return first_eligible
+
+
+def _hash(key):
+    """Hash a string to a 64-bit integer that's the same in every process."""
+    if isinstance(key, unicode):
+        key = key.encode('utf-8')
+    return struct.unpack('>Q', hashlib.md5(key).digest()[:8])[0]
+
+
+def _first_done(futures):
+    """Return a Future that resolves with whichever future finishes first."""
+    first = Future()
+
+    def on_done(future):
+        if not first.done():
+            first.set_result(future)
+
+    for future in futures:
+        future.add_done_callback(on_done)
+    return first
+
+
+def _highest_score(peers, scorer, score_threshold, blacklist):
+    """Return the Peer with the highest score above the threshold.
+
+    Peers on the blacklist and peers whose circuit breaker is open are
+    ignored.
+    """
+    chosen_peer = None
+    chosen_score = 0
+    now = IOLoop.current().time()
+
+    for peer in peers:
+        if peer.hostport in blacklist:
+            continue
 
-            if score > chosen_score:
-                chosen_peer = peer
-                chosen_score = score
+        if not peer.breaker.available(now):
+            continue
 
-        return chosen_peer
+        score = scorer.score(peer)
+
+        if score <= score_threshold:
+            continue
+
+        if score > chosen_score:
+            chosen_peer = peer
+            chosen_score = score
+
+    return chosen_peer
 
 
 class Peer(object):
@@ -246,6 +779,12 @@ class Peer(object):
         'state',
         'host',
         'port',
+        'min_connections',
+        'max_connections',
+        'grow_threshold',
+        'on_connection_change',
+        'stats',
+        'breaker',
 
         '_out_conns',
         '_in_conns',
@@ -257,7 +796,11 @@ class Peer(object):
     # It must support a .outgoing method.
     connection_class = StreamConnection
 
-    def __init__(self, tchannel, hostport, state=None):
+    def __init__(self, tchannel, hostport, state=None,
+                 min_connections=DEFAULT_MIN_CONNECTIONS,
+                 max_connections=DEFAULT_MAX_CONNECTIONS,
+                 grow_threshold=DEFAULT_GROW_THRESHOLD,
+                 breaker=None):
         """Initialize a Peer
 
         :param tchannel:
@@ -266,45 +809,78 @@ class Peer(object):
             Host-port this Peer is for.
         :param state:
             State of the Peer. If given, this must be an instance of PeerState.
+        :param min_connections:
+            Number of connections to keep open to this Peer once it's been
+            used. Incoming connections count towards this.
+        :param max_connections:
+            Maximum number of outgoing connections to make to this Peer.
+        :param grow_threshold:
+            Number of outstanding requests on the least loaded connection at
+            which another outgoing connection is made.
+        :param breaker:
+            CircuitBreaker that ejects this Peer from selection while it's
+            failing. Defaults to a CircuitBreaker with default settings.
         """
         state = state or PeerHealthyState(self)
 
         assert hostport, "hostport is required"
         assert isinstance(state, PeerState), "state must be a PeerState"
+        assert 0 < min_connections <= max_connections, (
+            "min_connections must be between 1 and max_connections"
+        )
 
         self.tchannel = tchannel
         self.state = state
         self.host, port = hostport.rsplit(':', 1)
         self.port = int(port)
 
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.grow_threshold = grow_threshold
+
+        # Called with this Peer when a connection to it is added or removed.
+        self.on_connection_change = None
+
+        # Latency and error rate of requests made to this Peer.
+        self.stats = PeerStats()
+
+        self.breaker = breaker or CircuitBreaker()
+
         self._out_conns = deque()
         self._in_conns = deque()
 
         # This contains a future to the TornadoConnection if we're already in
         # the process of making an outgoing connection to the peer. This
-        # helps avoid making multiple outgoing connections.
+        # helps avoid making multiple outgoing connections at once.
         self._connecting = None
 
     def connect(self):
         """Get a connection to this peer.
 
-        If an connection to the peer already exists (either incoming or
-        outgoing), that's returned. Otherwise, a new outgoing connection to
-        this peer is created.
+        If connections to the peer already exist (either incoming or
+        outgoing), the one with the fewest outstanding requests is returned.
+        Otherwise, a new outgoing connection to this peer is created.
+
+        Another outgoing connection is made in the background if there are
+        fewer than ``min_connections`` open connections, or if the returned
+        connection has ``grow_threshold`` or more outstanding requests and
+        there are fewer than ``max_connections`` outgoing connections.
 
         :return:
             A future containing a connection to this host.
         """
-        # Prefer recently created outgoing connections over everything else.
-        conns = (
+        # Prefer recently created outgoing connections over everything else
+        # when they're equally loaded.
+        conns = [
             conn for conn in chain(self._out_conns, self._in_conns)
             if not conn.closed
-        )
-        try:
-            conn = next(conns)
-        except StopIteration:
-            pass
-        else:
+        ]
+        if conns:
+            conn = min(conns, key=lambda c: c.outstanding_requests)
+            if (not self._connecting and
+                    self._should_grow(conn, len(conns))):
+                self._connect()
+
             # Wrap the connection in a Future
             return gen.maybe_future(conn)
 
@@ -313,6 +889,30 @@ class Peer(object):
             # and re-use that connection.
             return self._connecting
 
+        return self._connect()
+
+    def _should_grow(self, conn, num_conns):
+        """Whether another outgoing connection should be made.
+
+        :param conn:
+            Least loaded connection to this peer
+        :param num_conns:
+            Number of open connections to this peer, incoming or outgoing
+        """
+        num_out_conns = sum(1 for c in self._out_conns if not c.closed)
+        if num_out_conns >= self.max_connections:
+            return False
+        return (
+            num_conns < self.min_connections or
+            conn.outstanding_requests >= self.grow_threshold
+        )
+
+    def _connect(self):
+        """Make a new outgoing connection to this peer.
+
+        :return:
+            A future containing the new connection.
+        """
         conn_future = self._connecting = self.connection_class.outgoing(
             hostport=self.hostport,
             process_name=self.tchannel.process_name,
@@ -328,6 +928,10 @@ class Peer(object):
 
                 connection = conn_future.result()
                 self._out_conns.appendleft(connection)
+                connection.set_close_callback(
+                    lambda: self._on_conn_close(connection)
+                )
+                self._connection_changed()
             self._connecting = None
 
         conn_future.add_done_callback(on_connect)
@@ -336,8 +940,34 @@ class Peer(object):
     def register_incoming(self, conn):
         assert conn, "conn is required"
         self._in_conns.append(conn)
+        conn.set_close_callback(lambda: self._on_conn_close(conn))
+        self._connection_changed()
+
+    def _on_conn_close(self, conn):
+        """Forget about a connection that was closed."""
+        for conns in (self._out_conns, self._in_conns):
+            try:
+                conns.remove(conn)
+            except ValueError:
+                pass
+        self._connection_changed()
+
+    def _connection_changed(self):
+        if self.on_connection_change is not None:
+            self.on_connection_change(self)
+
+    def close_idle_connections(self, idle_since):
+        """Close connections that have been idle since the given time.
 
-        # TODO on-close cleanup
+        Connections with calls in flight are never closed.
+
+        :param idle_since:
+            IOLoop time. Connections with no traffic after it are closed.
+        """
+        for conn in self.connections:
+            if conn.idle and conn.last_activity <= idle_since:
+                log.debug("Closing idle connection to %s", self.hostport)
+                conn.close()
 
     @property
     def hostport(self):
@@ -361,6 +991,11 @@ class Peer(object):
         """Returns a list of all incoming connections for this peer."""
         return list(self._in_conns)
 
+    @property
+    def outstanding_requests(self):
+        """Number of outgoing calls to this Peer waiting for a response."""
+        return sum(conn.outstanding_requests for conn in self.connections)
+
     @property
     def is_ephemeral(self):
         """Whether this Peer is ephemeral."""
@@ -429,7 +1064,8 @@ class PeerClientOperation(object):
                  retry=None,
                  parent_tracing=None,
                  hostport=None,
-                 score_threshold=None):
+                 score_threshold=None,
+                 scorer=None):
         """Initialize a new PeerClientOperation.
 
         :param peer_group:
@@ -445,6 +1081,9 @@ class PeerClientOperation(object):
             tracing span from parent request
         :param hostport
             remote server's host port.
+        :param scorer
+            PeerScorer used to rank peers. Defaults to the scorer of the
+            peer group.
         """
         assert peer_group, "peer group must not be None"
         service = service or ''
@@ -468,15 +1107,18 @@ class PeerClientOperation(object):
         # not retry if hostport is set.
         self._hostport = hostport
         self._score_threshold = score_threshold
+        self._scorer = scorer
         # service name is not stored in peer because the same peer may be
         # used to call multiple services if it's being used for request
         # forwarding
 
-    def _choose(self, blacklist=None):
+    def _choose(self, blacklist=None, shard_key=None):
         peer = self.peer_group.choose(
             hostport=self._hostport,
             score_threshold=self._score_threshold,
             blacklist=blacklist,
+            scorer=self._scorer,
+            shard_key=shard_key,
         )
 
         return peer
@@ -488,6 +1130,7 @@ class PeerClientOperation(object):
         traceflag=None,
         retry_limit=None,
         ttl=None,
+        hedge_delay=None,
     ):
         """Make a request to the Peer.
 
@@ -509,6 +1152,12 @@ class PeerClientOperation(object):
            is 0, it means no retry.
         :param ttl:
             Timeout for each request (ms).
+        :param hedge_delay:
+            If specified, a copy of the request is sent to another peer if
+            no response arrived after this many seconds. Whichever response
+            arrives first is used and the other request is cancelled. Only
+            use this for idempotent calls. Streaming requests and requests
+            to a specific host-port are never hedged.
         :return:
             Future that contains the response from the peer.
         """
@@ -517,7 +1166,8 @@ class PeerClientOperation(object):
         # If we can't find available peer at the first time, we throw
         # NoAvailablePeerError. Later during retry, if we can't find available
         # peer, we throw exceptions from retry not NoAvailablePeerError.
-        peer = self._choose()
+        shard_key = headers.get(SHARD_KEY) if headers else None
+        peer = self._choose(shard_key=shard_key)
         if not peer:
             raise NoAvailablePeerError(
                 "Can't find an available peer for '%s'" % self.service
@@ -578,9 +1228,12 @@ class PeerClientOperation(object):
         if request.is_streaming_request:
             request.ttl = 0
 
+        if request.is_streaming_request or self._hostport:
+            hedge_delay = None
+
         try:
             response = yield self.send_with_retry(
-                request, peer, retry_limit, connection
+                request, peer, retry_limit, connection, hedge_delay
             )
         except Exception as e:
             # event: on_exception
@@ -594,20 +1247,46 @@ class PeerClientOperation(object):
         raise gen.Return(response)
 
     @gen.coroutine
-    def _send(self, connection, req):
+    def _send(self, connection, req, peer):
         # event: send_request
         self.tchannel.event_emitter.fire(EventType.before_send_request, req)
+        io_loop = IOLoop.current()
+        sent_at = io_loop.time()
+        probe = peer.breaker.before_request(sent_at)
         response_future = connection.send_request(req)
 
-        with timeout(response_future, req.ttl):
-            try:
-                response = yield response_future
-            except TChannelError as error:
-                # event: after_receive_error
-                self.tchannel.event_emitter.fire(
-                    EventType.after_receive_error, req, error,
-                )
-                raise
+        # The connection times the request out after its TTL.
+        try:
+            response = yield response_future
+        except CanceledError as error:
+            # We gave up on the request, so there's nothing to learn about
+            # the peer from it. Let another request probe it instead.
+            peer.breaker.release_probe(probe)
+
+            # event: after_receive_error
+            self.tchannel.event_emitter.fire(
+                EventType.after_receive_error, req, error,
+            )
+            raise
+        except TChannelError as error:
+            now = io_loop.time()
+            peer.stats.record_error(now, now - sent_at)
+            if isinstance(error, PEER_FAILURES):
+                peer.breaker.record_failure(now, sent_at, probe)
+            else:
+                # The peer is alive, the request just didn't work out.
+                peer.breaker.record_success(sent_at, probe)
+
+            # event: after_receive_error
+            self.tchannel.event_emitter.fire(
+                EventType.after_receive_error, req, error,
+            )
+            raise
+
+        now = io_loop.time()
+        peer.stats.record_response(now, now - sent_at)
+        peer.breaker.record_success(sent_at, probe)
+
         # event: after_receive_response
         self.tchannel.event_emitter.fire(
             EventType.after_receive_response, req, response,
@@ -615,12 +1294,95 @@ class PeerClientOperation(object):
         raise gen.Return(response)
 
     @gen.coroutine
-    def send_with_retry(self, request, peer, retry_limit, connection):
+    def _send_hedged(self, connection, req, peer, blacklist, hedge_delay):
+        """Send the request, and a copy to another peer if it's slow.
+
+        Errors for the original request are raised only if the copy failed
+        too, or if there was no other peer to send a copy to.
+        """
+        response_future = self._send(connection, req, peer)
+        try:
+            response = yield gen.with_timeout(
+                timedelta(seconds=hedge_delay), response_future
+            )
+        except gen.TimeoutError:
+            pass
+        else:
+            raise gen.Return(response)
+
+        hedge_peer = self._choose(
+            blacklist=blacklist | set([peer.hostport]),
+            shard_key=req.headers.get(SHARD_KEY),
+        )
+        if hedge_peer is None:
+            response = yield response_future
+            raise gen.Return(response)
+
+        # The copy is paid for like a retry.
+        if not self._withdraw_retry():
+            log.debug('Retry budget exhausted, not hedging %s', req)
+            response = yield response_future
+            raise gen.Return(response)
+
+        try:
+            hedge_connection = yield hedge_peer.connect()
+        except NetworkError:
+            # The original request is still fine; only the hedge peer is
+            # to blame.
+            now = IOLoop.current().time()
+            hedge_peer.breaker.record_failure(
+                now, now, hedge_peer.breaker.before_request(now)
+            )
+            response = yield response_future
+            raise gen.Return(response)
+
+        hedge_req = req.clone(hedge_connection.next_message_id())
+        hedge_req.tracing.endpoint = Endpoint(
+            hedge_peer.host, hedge_peer.port, self.service
+        )
+        hedge_future = self._send(hedge_connection, hedge_req, hedge_peer)
+
+        attempts = {
+            response_future: (connection, req),
+            hedge_future: (hedge_connection, hedge_req),
+        }
+        while attempts:
+            done = yield _first_done(attempts.keys())
+            del attempts[done]
+            if done.exception() is not None:
+                continue
+
+            # The first response wins. Cancel the other request.
+            for loser, (loser_connection, loser_req) in attempts.items():
+                self.clean_up_outgoing_request(
+                    loser_req, loser_connection, CanceledError(), why='hedged'
+                )
+                # Nobody is going to look at the CanceledError.
+                IOLoop.current().add_future(loser, lambda f: f.exception())
+            raise gen.Return(done.result())
+
+        # Both failed. Report the error for the original request; the caller
+        # cleans that one up. Don't retry on the hedge peer either.
+        blacklist.add(hedge_peer.hostport)
+        self.clean_up_outgoing_request(
+            hedge_req, hedge_connection, hedge_future.exception(),
+        )
+        yield response_future
+
+    @gen.coroutine
+    def send_with_retry(self, request, peer, retry_limit, connection,
+                        hedge_delay=None):
         # black list to record all used peers, so they aren't chosen again.
         blacklist = set()
         for num_of_attempt in range(retry_limit + 1):
             try:
-                response = yield self._send(connection, request)
+                if hedge_delay:
+                    response = yield self._send_hedged(
+                        connection, request, peer, blacklist, hedge_delay
+                    )
+                else:
+                    response = yield self._send(connection, request, peer)
+                self._record_success()
                 raise gen.Return(response)
             # Why are we retying on all errors????
             except TChannelError as error:
@@ -653,13 +1415,54 @@ class PeerClientOperation(object):
                                  num_of_attempt, max_retry_limit):
             raise gen.Return((None, None))
 
+        if not self._withdraw_retry():
+            # event: on_retry_denied
+            self.tchannel.event_emitter.fire(
+                EventType.on_retry_denied, request, protocol_error,
+            )
+            raise gen.Return((None, None))
+
+        backoff = self.tchannel.retry_backoff
+        if backoff:
+            # Full jitter exponential backoff.
+            yield gen.sleep(random() * backoff * 2 ** num_of_attempt)
+
         result = yield self.prepare_next_request(request, blacklist)
         raise gen.Return(result)
 
+    def _retry_budgets(self):
+        budgets = (
+            self.tchannel.retry_budget,
+            self.tchannel.service_retry_budgets.get(self.service),
+        )
+        return [budget for budget in budgets if budget is not None]
+
+    def _record_success(self):
+        now = IOLoop.current().time()
+        for budget in self._retry_budgets():
+            budget.record_success(now)
+
+    def _withdraw_retry(self):
+        """Take a retry out of the retry budgets.
+
+        :returns:
+            False if a budget doesn't allow the retry.
+        """
+        now = IOLoop.current().time()
+        budgets = self._retry_budgets()
+        if not all(budget.can_retry(now) for budget in budgets):
+            return False
+        for budget in budgets:
+            budget.withdraw()
+        return True
+
     @gen.coroutine
     def prepare_next_request(self, request, blacklist):
         # find new peer
-        peer = self._choose(blacklist=blacklist,)
+        peer = self._choose(
+            blacklist=blacklist,
+            shard_key=request.headers.get(SHARD_KEY),
+        )
 
         # no peer is available
         if not peer:
@@ -679,7 +1482,12 @@ class PeerClientOperation(object):
         )
 
     @staticmethod
-    def clean_up_outgoing_request(request, connection, error):
+    def clean_up_outgoing_request(request, connection, error, why=None):
+        # Nobody is waiting for the response anymore. Let the server know so
+        # that it can stop working on it.
+        if why is None and isinstance(error, TimeoutError):
+            why = 'timeout'
+        connection.cancel_request(request, why=why)
         # stop the outgoing request
         request.set_exception(error)
         # remove from pending request list
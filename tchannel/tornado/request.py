@@ -76,25 +76,65 @@ class Request(object):
 
         self.is_streaming_request = self._is_streaming_request()
         if not self.is_streaming_request:
-            self._copy_argstreams = [
-                self.argstreams[0].clone(),
-                self.argstreams[1].clone(),
-                self.argstreams[2].clone(),
-            ]
+            # Only hold on to the chunks so that the request can be rewound.
+            # Streams are rebuilt from them if it's retried or cloned.
+            self._arg_snapshots = (
+                self.argstreams[0].snapshot(),
+                self.argstreams[1].snapshot(),
+                self.argstreams[2].snapshot(),
+            )
 
         self.endpoint = endpoint or ""
 
+        # Set when the caller cancels the request.
+        self.cancelled = False
+
     def rewind(self, id=None):
         self.id = id
         if not self.is_streaming_request:
-            self.argstreams = [
-                self._copy_argstreams[0].clone(),
-                self._copy_argstreams[1].clone(),
-                self._copy_argstreams[2].clone(),
-            ]
+            self.argstreams = self._snapshot_argstreams()
         self.state = StreamState.init
         self.tracing = Trace()
 
+    def clone(self, id=None):
+        """Make a copy of this request that can be sent on its own.
+
+        The copy gets its own argstreams and span, so it can be in flight at
+        the same time as this request. The span belongs to the same trace
+        and has the same parent as this request's. Streaming requests can't
+        be cloned.
+
+        :param id:
+            Message ID of the copy
+        """
+        assert not self.is_streaming_request, (
+            "streaming requests can't be cloned"
+        )
+        return Request(
+            id=id,
+            flags=self.flags,
+            ttl=self.ttl,
+            service=self.service,
+            headers=self.headers,
+            checksum=self.checksum,
+            argstreams=self._snapshot_argstreams(),
+            tracing=Trace(
+                name=self.tracing.name,
+                trace_id=self.tracing.trace_id,
+                parent_span_id=self.tracing.parent_span_id,
+                endpoint=self.tracing.endpoint,
+                traceflags=self.tracing.traceflags,
+            ),
+            serializer=self.serializer,
+            endpoint=self.endpoint,
+        )
+
+    def _snapshot_argstreams(self):
+        return [
+            InMemStream.from_snapshot(snapshot)
+            for snapshot in self._arg_snapshots
+        ]
+
     @property
     def arg_scheme(self):
         return self.headers.get('as', None)
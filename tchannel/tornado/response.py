@@ -73,6 +73,10 @@ class Response(object):
         self.state = StreamState.init
         self.flushed = False
 
+        # Set when the caller cancels the request. No more fragments of the
+        # response are written once it's set.
+        self.cancelled = False
+
         self.serializer = serializer or RawSerializer()
 
     @property
@@ -18,6 +18,8 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import mmap
+import os
 from collections import deque
 
 import tornado
@@ -37,7 +39,6 @@ except ImportError:  # pragma: no cover
     from toro import Condition
 
 
-@tornado.gen.coroutine
 def read_full(stream):
     """Read the full contents of the given stream into memory.
 
@@ -46,16 +47,88 @@ def read_full(stream):
     """
     assert stream, "stream is required"
 
+    if isinstance(stream, InMemStream):
+        # Completed in-memory streams are read right away instead of
+        # chunk by chunk through the IOLoop.
+        contents = stream.read_nowait()
+        if contents is not None:
+            future = tornado.concurrent.Future()
+            future.set_result(contents)
+            return future
+
+    return _read_full(stream)
+
+
+@tornado.gen.coroutine
+def _read_full(stream):
     chunks = []
     chunk = yield stream.read()
 
     while chunk:
+        if isinstance(chunk, buffer):
+            # FileStream chunks reference the file mapping.
+            chunk = bytes(chunk)
         chunks.append(chunk)
         chunk = yield stream.read()
 
     raise tornado.gen.Return(b''.join(chunks))
 
 
+@tornado.gen.coroutine
+def read_into(stream, buf=None):
+    """Read the full contents of the given stream into a single bytearray.
+
+    Each chunk is copied once, straight into ``buf``, so no join is needed
+    at the end.
+
+    :param buf:
+        bytearray to append the contents to. A new one is used if omitted.
+    :return:
+        A future containing the bytearray.
+    """
+    assert stream, "stream is required"
+
+    if buf is None:
+        buf = bytearray()
+
+    chunk = yield stream.read()
+    while chunk:
+        buf += chunk
+        chunk = yield stream.read()
+
+    raise tornado.gen.Return(buf)
+
+
+@tornado.gen.coroutine
+def read_into_file(stream, fd):
+    """Write the contents of the given stream to a file as they arrive.
+
+    Only one chunk is held in memory at a time, so this can be used to
+    receive bodies that are too large to keep in memory.
+
+    The chunks are written with blocking ``os.write`` calls on the IOLoop.
+    That's fine for local disks, but the IOLoop stalls for as long as each
+    write takes, so don't point this at slow or network filesystems.
+
+    :param fd:
+        An integer file descriptor opened for writing.
+    :return:
+        A future containing the number of bytes written.
+    """
+    assert stream, "stream is required"
+
+    written = 0
+    chunk = yield stream.read()
+    while chunk:
+        offset = 0
+        while offset < len(chunk):
+            offset += os.write(fd, buffer(chunk, offset))
+        written += offset
+        chunk = yield stream.read()
+
+    raise tornado.gen.Return(written)
+
+
 class Stream(object):
 
     def read(self):
@@ -99,18 +172,29 @@ class Stream(object):
 
 class InMemStream(Stream):
 
-    def __init__(self, buf=None, auto_close=True):
+    def __init__(self, buf=None, auto_close=True, max_size=None):
         """In-Memory based stream
 
         :param buf: the buffer for the in memory stream
+        :param max_size:
+            If set, the number of buffered bytes at which ``write()`` stops
+            resolving its futures right away. The futures resolve once a
+            reader has made room again. Unbounded by default.
         """
         self._stream = deque()
         if buf:
             self._stream.append(buf)
         self.state = StreamState.init
-        self._condition = Condition()
+        # Only created once a reader has to wait for data, so streams that
+        # are complete from the start never allocate one.
+        self._condition = None
         self.auto_close = auto_close
 
+        self.max_size = max_size
+        self._buffered = len(buf) if buf and max_size is not None else 0
+        # Waited on by writers while the stream is full.
+        self._room = None
+
         self.exception = None
 
     def clone(self):
@@ -118,8 +202,27 @@ class InMemStream(Stream):
         new_stream.state = self.state
         new_stream.auto_close = self.auto_close
         new_stream._stream = deque(self._stream)
+        new_stream.max_size = self.max_size
+        new_stream._buffered = self._buffered
         return new_stream
 
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Build a completed stream from the result of ``snapshot()``."""
+        stream = cls()
+        stream._stream.extend(snapshot)
+        stream.state = StreamState.completed
+        return stream
+
+    def snapshot(self):
+        """Capture the chunks buffered in the stream right now.
+
+        The chunks themselves are shared, not copied.
+
+        :return: a tuple of the chunks
+        """
+        return tuple(self._stream)
+
     def read(self):
 
         def read_chunk(future):
@@ -127,18 +230,33 @@ class InMemStream(Stream):
                 future.set_exception(self.exception)
                 return future
 
-            chunk = ""
-
-            while len(self._stream) and len(chunk) < common.MAX_PAYLOAD_SIZE:
-                chunk += self._stream.popleft()
-
-            future.set_result(chunk)
+            # Collect the pieces and join them once; concatenating them one
+            # by one is quadratic in the number of pieces.
+            pieces = []
+            size = 0
+
+            while len(self._stream) and size < common.MAX_PAYLOAD_SIZE:
+                piece = self._stream.popleft()
+                if isinstance(piece, buffer):
+                    # Fragmented args reference the original arg.
+                    piece = bytes(piece)
+                pieces.append(piece)
+                size += len(piece)
+
+            if self.max_size is not None:
+                self._buffered -= size
+                if self._room is not None and self._buffered < self.max_size:
+                    self._room.notify_all()
+
+            future.set_result(b''.join(pieces))
             return future
 
         read_future = tornado.concurrent.Future()
 
         # We're not ready yet
         if self.state != StreamState.completed and not len(self._stream):
+            if self._condition is None:
+                self._condition = Condition()
             wait_future = self._condition.wait()
             tornado.ioloop.IOLoop.current().add_future(
                 wait_future,
@@ -148,6 +266,32 @@ class InMemStream(Stream):
 
         return read_chunk(read_future)
 
+    def drained(self):
+        """Whether the stream is completed and everything has been read."""
+        return (
+            self.state == StreamState.completed and
+            not self.exception and
+            not self._stream
+        )
+
+    def read_nowait(self):
+        """Read the rest of a completed stream synchronously.
+
+        :return:
+            The remaining contents of the stream, or None if the stream is
+            still open or has an exception set.
+        """
+        if self.exception or self.state != StreamState.completed:
+            return None
+
+        chunks = [
+            bytes(piece) if isinstance(piece, buffer) else piece
+            for piece in self._stream
+        ]
+        self._stream.clear()
+        self._buffered = 0
+        return b''.join(chunks)
+
     def write(self, chunk):
         if self.exception:
             raise self.exception
@@ -157,7 +301,16 @@ class InMemStream(Stream):
 
         if chunk:
             self._stream.append(chunk)
-            self._condition.notify()
+            if self._condition is not None:
+                self._condition.notify()
+
+            if self.max_size is not None:
+                self._buffered += len(chunk)
+                if self._buffered >= self.max_size:
+                    # Hold the writer back until a reader makes room.
+                    if self._room is None:
+                        self._room = Condition()
+                    return self._room.wait()
 
         # This needs to return a future to match the async interface.
         r = tornado.concurrent.Future()
@@ -170,7 +323,46 @@ class InMemStream(Stream):
 
     def close(self):
         self.state = StreamState.completed
-        self._condition.notify()
+        if self._condition is not None:
+            self._condition.notify()
+        # Nothing more can be written, so don't keep writers waiting.
+        if self._room is not None:
+            self._room.notify_all()
+
+
+class ChunkIterator(object):
+    """Iterate over futures for the chunks of a stream.
+
+    .. code-block:: python
+
+        for chunk_future in ChunkIterator(stream):
+            chunk = yield chunk_future
+
+    Chunks are read one at a time, so each future must have resolved before
+    the iterator is advanced. The last future may resolve to an empty string
+    if the end of the stream wasn't known yet when it was requested.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._future = None
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        future = self._future
+        if future is not None:
+            assert future.done(), "the previous chunk hasn't been read yet"
+            if future.exception() is not None or not future.result():
+                raise StopIteration
+
+        stream = self.stream
+        if isinstance(stream, InMemStream) and stream.drained():
+            raise StopIteration
+
+        self._future = stream.read()
+        return self._future
 
 
 class PipeStream(Stream):
@@ -254,6 +446,82 @@ class PipeStream(Stream):
             self._rs.close()
 
 
+class FileStream(Stream):
+
+    def __init__(self, fd, offset=0, length=None, auto_close=False):
+        """Stream backed by a memory map of a file.
+
+        Chunks are ``buffer`` objects that reference the mapping, so the file
+        contents aren't copied until they're written to the connection. The
+        chunks stay valid until the stream is closed, which releases the
+        mapping. Connections close streams once they've been sent.
+
+        :param fd: an integer file descriptor opened for reading
+        :param offset: where in the file to start reading
+        :param length:
+            number of bytes to read. Reads to the end of the file by default.
+        :param auto_close:
+            flag to close the file descriptor once the stream is closed
+        """
+        size = os.fstat(fd).st_size
+        self._fd = fd
+        self._close_fd = auto_close
+        # Empty files can't be mapped.
+        self._mmap = (mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+                      if size else None)
+        self._position = min(offset, size)
+        self._end = size if length is None else min(offset + length, size)
+        # Nothing is ever written to the stream, so there's nothing to close
+        # once the writer is done. Only closing it for good releases it.
+        self.auto_close = False
+        self.state = StreamState.init
+
+        self.exception = None
+
+    def read(self):
+        future = tornado.concurrent.Future()
+
+        if self.exception:
+            future.set_exception(self.exception)
+            return future
+
+        if self._position >= self._end:
+            # The last chunk may not have been written yet, so the mapping
+            # is only released by close().
+            self.state = StreamState.completed
+            future.set_result("")
+            return future
+
+        self.state = StreamState.streaming
+        size = min(common.MAX_PAYLOAD_SIZE, self._end - self._position)
+        chunk = buffer(self._mmap, self._position, size)
+        self._position += size
+
+        future.set_result(chunk)
+        return future
+
+    def write(self, chunk):
+        raise UnexpectedError("FileStream is read-only.")
+
+    def set_exception(self, exception):
+        self.exception = exception
+        self._release()
+
+    def close(self):
+        self._release()
+
+    def _release(self):
+        self.state = StreamState.completed
+        self._position = self._end
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+        if self._close_fd and self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
 def maybe_stream(s):
     """Ensure that the given argument is a stream."""
     if isinstance(s, Stream):
@@ -40,6 +40,7 @@ from ..event import EventRegistrar
 from ..net import local_ip
 from ..schemes import DEFAULT_NAMES
 from ..schemes import JSON
+from ..schemes import RAW
 from ..serializer.json import JsonSerializer
 from ..serializer.raw import RawSerializer
 from .connection import StreamConnection
@@ -65,7 +66,9 @@ class TChannel(object):
     FALLBACK = RequestDispatcher.FALLBACK
 
     def __init__(self, name, hostport=None, process_name=None,
-                 known_peers=None, trace=False, dispatcher=None):
+                 known_peers=None, trace=False, dispatcher=None,
+                 peer_chooser=None, peer_scorer=None, retry_budget=None,
+                 service_retry_budgets=None, retry_backoff=None):
         """Build or re-use a TChannel.
 
         :param name:
@@ -89,6 +92,33 @@ class TChannel(object):
         :param trace:
             Flag to turn on/off zipkin trace. It can be a bool variable or
             a function that return true or false.
+
+        :param peer_chooser:
+            PeerChooser used to pick the peer each request is sent to.
+            Defaults to picking the peer with the highest score. Use a
+            ``ConsistentHashChooser`` to send requests with the same shard
+            key to the same peer.
+
+        :param peer_scorer:
+            PeerScorer used to rank peers when choosing where to send
+            requests. Defaults to scoring peers by their state. Use a
+            ``LeastPendingScorer`` to route requests away from peers that are
+            backing up. This can also be overridden per request with the
+            ``scorer`` argument to ``request``.
+
+        :param retry_budget:
+            A ``tchannel.retry.RetryBudget`` that limits the retries made
+            through this TChannel to a fraction of its successful requests.
+            Retries are not limited by default.
+
+        :param service_retry_budgets:
+            A dictionary from service name to ``RetryBudget`` for services
+            that need their own limits on top of ``retry_budget``.
+
+        :param retry_backoff:
+            If specified, retries wait for a random time of up to
+            ``retry_backoff * 2 ** attempt`` seconds. Retries are made right
+            away by default.
         """
         self._state = State.ready
 
@@ -97,7 +127,9 @@ class TChannel(object):
         else:
             self._handler = dispatcher
 
-        self.peers = PeerGroup(self)
+        self.peers = PeerGroup(
+            self, chooser=peer_chooser, scorer=peer_scorer
+        )
 
         self._port = 0
         self._host = None
@@ -117,6 +149,10 @@ class TChannel(object):
         self.name = name
         self._trace = trace
 
+        self.retry_budget = retry_budget
+        self.service_retry_budgets = service_retry_budgets or {}
+        self.retry_backoff = retry_backoff
+
         # register event hooks
         self.event_emitter = EventEmitter()
         self.hooks = EventRegistrar(self.event_emitter)
@@ -125,6 +161,9 @@ class TChannel(object):
             for peer_hostport in known_peers:
                 self.peers.add(peer_hostport)
 
+        # Map from service name to the PeerGroup of its subchannel.
+        self._subchannels = {}
+
         # server created from calling listen()
         self._server = None
 
@@ -183,7 +222,10 @@ class TChannel(object):
 
         self._state = State.closing
         try:
-            yield self.peers.clear()
+            yield [self.peers.clear()] + [
+                peer_group.clear()
+                for peer_group in self._subchannels.values()
+            ]
         finally:
             self._state = State.closed
 
@@ -221,12 +263,51 @@ class TChannel(object):
         # TODO disallow certain parameters or don't propagate them backwards.
         # For example, blacklist and score threshold aren't really
         # user-configurable right now.
-        return self.peers.request(hostport=hostport,
+        peer_group = self._subchannels.get(service, self.peers)
+        return peer_group.request(hostport=hostport,
                                   service=service,
                                   arg_scheme=arg_scheme,
                                   retry=retry,
                                   **kwargs)
 
+    def subchannel(self, service, known_peers=None, **kwargs):
+        """Get the subchannel for the given service.
+
+        A subchannel is a PeerGroup of its own that only holds the peers of
+        one service. Requests for a service that has a subchannel only
+        consider the peers in it, with the chooser, scorer, score threshold
+        and connection limits it was created with. Requests for all other
+        services keep going through ``peers``.
+
+        The subchannel is created the first time this is called for a
+        service.
+
+        :param service:
+            Name of the service
+        :param known_peers:
+            A list of host-ports at which the service can be reached. These
+            are added to the subchannel if it doesn't know about them yet.
+        :param kwargs:
+            Passed on to the PeerGroup when the subchannel is created.
+        :returns:
+            The PeerGroup of the subchannel
+        """
+        peer_group = self._subchannels.get(service)
+        if peer_group is None:
+            peer_group = self._subchannels[service] = PeerGroup(
+                self, **kwargs
+            )
+        else:
+            assert not kwargs, (
+                "subchannel for '%s' already exists" % service
+            )
+
+        for hostport in known_peers or ():
+            if not peer_group.lookup(hostport):
+                peer_group.add(hostport)
+
+        return peer_group
+
     def listen(self, port=None):
         """Start listening for incoming connections.
 
@@ -283,7 +364,8 @@ class TChannel(object):
             return
         return self._handler.handle(message, connection)
 
-    def _register_simple(self, endpoint, scheme, f):
+    def _register_simple(self, endpoint, scheme, f, streaming=False,
+                         cache=None):
         """Register a simple endpoint with this TChannel.
 
         :param endpoint:
@@ -293,15 +375,27 @@ class TChannel(object):
             registered.
         :param f:
             Callable handler for the endpoint.
+        :param streaming:
+            Whether the handler streams the request and response bodies.
+            Only supported for raw endpoints.
+        :param cache:
+            ``LRUCache`` to answer repeated requests from. See
+            ``RequestDispatcher.register``.
         """
         assert scheme in DEFAULT_NAMES, ("Unsupported arg scheme %s" % scheme)
+        assert not streaming or scheme == RAW, (
+            "Only raw endpoints can be streaming"
+        )
         if scheme == JSON:
             req_serializer = JsonSerializer()
             resp_serializer = JsonSerializer()
         else:
             req_serializer = RawSerializer()
             resp_serializer = RawSerializer()
-        self._handler.register(endpoint, f, req_serializer, resp_serializer)
+        self._handler.register(
+            endpoint, f, req_serializer, resp_serializer,
+            streaming=streaming, cache=cache,
+        )
         return f
 
     def _register_thrift(self, service_module, handler, **kwargs):
@@ -360,6 +454,14 @@ class TChannel(object):
             If specified, this is the handler function. If ignored, this
             function returns a decorator that can be used to register the
             handler function.
+        :param streaming:
+            If True, the handler streams the request and response bodies.
+            See ``RequestDispatcher.register``. Only supported for raw
+            endpoints.
+        :param cache:
+            If specified, an ``LRUCache`` that successful responses are kept
+            in, so that identical requests are answered without calling the
+            handler. Only use this for idempotent endpoints.
 
         :returns:
             If ``handler`` was specified, this returns ``handler``. Otherwise,
@@ -20,26 +20,119 @@
 
 from __future__ import absolute_import
 
+import math
+
 import tornado
 import tornado.ioloop
 
-import contextlib2
 
-from ..errors import TimeoutError
+class TimerWheel(object):
+    """A hashed timer wheel that expires timeouts in batches.
+
+    Timeouts are hashed into ``slots`` buckets by the ``tick`` in which they
+    expire. Adding and cancelling a timeout is O(1), and the wheel keeps at
+    most one callback scheduled on the IOLoop no matter how many timeouts it
+    holds. Timeouts fire up to one ``tick`` late.
+
+    :param on_expire:
+        Called with the list of keys whose timeouts expired during a tick.
+    :param tick:
+        Resolution of the wheel in seconds.
+    :param slots:
+        Number of buckets in the wheel.
+    :param io_loop:
+        IOLoop to schedule ticks on. Defaults to the current IOLoop when the
+        first timeout is added.
+    """
+
+    def __init__(self, on_expire, tick=0.01, slots=512, io_loop=None):
+        self.on_expire = on_expire
+        self.tick = tick
+        self.io_loop = io_loop
+
+        # Each slot maps keys to the index of the tick they expire in.
+        self._slots = [{} for _ in xrange(slots)]
+
+        # Map from key to the slot holding its timeout.
+        self._timers = {}
+
+        # Index of the last tick that was processed, and the handle of the
+        # callback scheduled for the next one.
+        self._tick_index = 0
+        self._handle = None
+
+    def __len__(self):
+        return len(self._timers)
+
+    def __contains__(self, key):
+        return key in self._timers
+
+    def add(self, key, seconds):
+        """Expire ``key`` after ``seconds`` seconds.
+
+        Replaces any timeout already set for ``key``.
+        """
+        self.cancel(key)
+
+        if self.io_loop is None:
+            self.io_loop = tornado.ioloop.IOLoop.current()
+
+        now = self.io_loop.time()
+        if self._handle is None:
+            # The wheel was idle so the last tick is stale.
+            self._tick_index = int(now / self.tick)
+            self._handle = self.io_loop.call_at(
+                (self._tick_index + 1) * self.tick, self._advance
+            )
+
+        index = max(
+            int(math.ceil((now + seconds) / self.tick)),
+            self._tick_index + 1,
+        )
+        slot = self._slots[index % len(self._slots)]
+        slot[key] = index
+        self._timers[key] = slot
+
+    def cancel(self, key):
+        """Cancel the timeout for ``key`` if there is one."""
+        slot = self._timers.pop(key, None)
+        if slot is not None:
+            del slot[key]
+
+    def clear(self):
+        """Cancel all timeouts."""
+        for slot in self._slots:
+            slot.clear()
+        self._timers.clear()
+        if self._handle is not None:
+            self.io_loop.remove_timeout(self._handle)
+            self._handle = None
+
+    def _advance(self):
+        now = self.io_loop.time()
+        current = int(now / self.tick)
+        num_slots = len(self._slots)
 
+        # Visit every slot we've passed since the last tick. If we fell more
+        # than a full turn behind, every slot needs to be visited only once.
+        expired = []
+        start = max(self._tick_index + 1, current - num_slots + 1)
+        for index in xrange(start, current + 1):
+            slot = self._slots[index % num_slots]
+            for key, expiry in slot.items():
+                # Slots are shared by timeouts from different turns.
+                if expiry <= current:
+                    del slot[key]
+                    del self._timers[key]
+                    expired.append(key)
 
-@contextlib2.contextmanager
-def timeout(future, seconds=0, io_loop=None):
-    # TODO: This is probably too heavy to attach to every request, should do
-    # this in the background.
-    io_loop = io_loop or tornado.ioloop.IOLoop.current()
+        self._tick_index = current
+        if self._timers:
+            self._handle = self.io_loop.call_at(
+                (current + 1) * self.tick, self._advance
+            )
+        else:
+            self._handle = None
 
-    def raise_timeout(*args, **kwargs):
-        if future.running():
-            future.set_exception(TimeoutError())
-    if not seconds:
-        # No timeout if seconds is set to 0.
-        yield
-    else:
-        io_loop.call_later(seconds, raise_timeout)
-        yield
+        if expired:
+            self.on_expire(expired)
@@ -21,24 +21,21 @@
 from __future__ import absolute_import
 
 import tornado
+import tornado.concurrent
 import tornado.gen
 
 from ..errors import TChannelError
+from .stream import read_full
 
 
-@tornado.gen.coroutine
 def get_arg(context, index):
     """get value from arg stream in async way"""
     if index < len(context.argstreams):
-        arg = ""
-        chunk = yield context.argstreams[index].read()
-        while chunk:
-            arg += chunk
-            chunk = yield context.argstreams[index].read()
-
-        raise tornado.gen.Return(arg)
+        return read_full(context.argstreams[index])
     else:
-        raise TChannelError()
+        future = tornado.concurrent.Future()
+        future.set_exception(TChannelError())
+        return future
 
 
 def chain(iterable, func):
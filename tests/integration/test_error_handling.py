@@ -145,3 +145,28 @@ def test_continue_message_error(mock_server):
 
     assert (e.value.message ==
             u"missing call message after receiving continue message")
+
+
+@pytest.mark.gen_test
+def test_errored_call_leaves_connection_idle():
+    server = TChannel(name='server')
+
+    @server.register('endpoint', 'raw')
+    def handler(request, response):
+        raise BadRequestError('no')
+
+    server.listen()
+
+    client = TChannel(name='client')
+    with pytest.raises(BadRequestError):
+        yield client.request(hostport=server.hostport).send(
+            'endpoint', '', '',
+        )
+
+    (peer,) = server.peers.peers
+    (connection,) = peer.connections
+    assert connection.idle
+
+    # So the idle reaper can close it.
+    peer.close_idle_connections(connection.last_activity)
+    assert connection.connection.closed()
@@ -0,0 +1,199 @@
+# Copyright (c) 2015 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from __future__ import absolute_import
+
+import socket
+
+import mock
+import pytest
+import tornado.gen
+import tornado.ioloop
+
+from tchannel.errors import CanceledError
+from tchannel.retry import RetryBudget
+from tchannel.tornado import TChannel
+from tchannel.tornado.breaker import CircuitBreaker
+from tchannel.tornado.peer import PeerClientOperation
+from tchannel.tornado.peer import PeerState
+from tchannel.tornado.stream import InMemStream
+
+
+class PreferredState(PeerState):
+    def score(self):
+        return 100
+
+
+def server(body, delay):
+
+    @tornado.gen.coroutine
+    def handler(request, response):
+        yield tornado.gen.sleep(delay)
+        response.set_body_s(InMemStream(body))
+
+    tchannel = TChannel(name='testserver', hostport='localhost:0')
+    tchannel.register('endpoint', 'raw', handler)
+    tchannel.listen()
+    return tchannel
+
+
+@pytest.mark.gen_test
+def test_hedged_request_uses_first_response():
+    slow = server('slow', 0.5)
+    fast = server('fast', 0)
+
+    tchannel = TChannel(name='test')
+    tchannel.peers.get(slow.hostport).state = PreferredState()
+    tchannel.peers.get(fast.hostport)
+
+    response = yield tchannel.request(service='server').send(
+        'endpoint', '', '', ttl=1, hedge_delay=0.05,
+    )
+    body = yield response.get_body()
+    assert body == 'fast'
+
+    # The slow request was cancelled.
+    slow_conn = tchannel.peers.get(slow.hostport).connections[0]
+    assert slow_conn.outstanding_requests == 0
+
+
+@pytest.mark.gen_test
+def test_hedged_request_cancels_the_loser():
+    slow = server('slow', 0.5)
+    fast = server('fast', 0)
+
+    tchannel = TChannel(name='test')
+    tchannel.peers.get(slow.hostport).state = PreferredState()
+    tchannel.peers.get(fast.hostport)
+
+    sends = []
+    send = PeerClientOperation._send
+
+    def record_send(self, connection, req, peer):
+        future = send(self, connection, req, peer)
+        sends.append(future)
+        return future
+
+    with mock.patch.object(PeerClientOperation, '_send', record_send):
+        response = yield tchannel.request(service='server').send(
+            'endpoint', '', '', ttl=1, hedge_delay=0.05,
+        )
+    body = yield response.get_body()
+    assert body == 'fast'
+
+    # Both attempts finish, the slow one with a CanceledError.
+    yield tornado.gen.sleep(0.01)
+    assert len(sends) == 2
+    assert all(future.done() for future in sends)
+    assert isinstance(sends[0].exception(), CanceledError)
+
+
+@pytest.mark.gen_test
+def test_hedged_request_needs_retry_budget():
+    slow = server('slow', 0.1)
+    fast = server('fast', 0)
+
+    tchannel = TChannel(
+        name='test',
+        retry_budget=RetryBudget(min_per_second=0),
+    )
+    tchannel.peers.get(slow.hostport).state = PreferredState()
+    tchannel.peers.get(fast.hostport)
+
+    response = yield tchannel.request(service='server').send(
+        'endpoint', '', '', ttl=1, hedge_delay=0.05,
+    )
+    body = yield response.get_body()
+    assert body == 'slow'
+
+    # No copy was sent.
+    assert not tchannel.peers.get(fast.hostport).connections
+
+
+@pytest.mark.gen_test
+def test_hedged_request_fast_enough():
+    slow = server('slow', 0.5)
+    fast = server('fast', 0)
+
+    tchannel = TChannel(name='test')
+    tchannel.peers.get(fast.hostport).state = PreferredState()
+    tchannel.peers.get(slow.hostport)
+
+    response = yield tchannel.request(service='server').send(
+        'endpoint', '', '', ttl=1, hedge_delay=0.2,
+    )
+    body = yield response.get_body()
+    assert body == 'fast'
+
+    # No copy was sent.
+    assert not tchannel.peers.get(slow.hostport).connections
+
+
+@pytest.mark.gen_test
+def test_losing_probe_leaves_breaker_open():
+    slow = server('slow', 0.5)
+    fast = server('fast', 0)
+
+    tchannel = TChannel(name='test')
+    slow_peer = tchannel.peers.get(slow.hostport)
+    slow_peer.state = PreferredState()
+    tchannel.peers.get(fast.hostport)
+
+    # The slow peer is ejected, but due for a probe.
+    now = tornado.ioloop.IOLoop.current().time()
+    slow_peer.breaker = CircuitBreaker(max_failures=1, backoff=0.01)
+    slow_peer.breaker.record_failure(now - 1, now - 1)
+
+    response = yield tchannel.request(service='server').send(
+        'endpoint', '', '', ttl=1, hedge_delay=0.05,
+    )
+    body = yield response.get_body()
+    assert body == 'fast'
+    yield tornado.gen.sleep(0.01)
+
+    # Cancelling the probe tells us nothing about the peer.
+    now = tornado.ioloop.IOLoop.current().time()
+    assert slow_peer.breaker.is_open
+    assert slow_peer.breaker.available(now)
+    assert slow_peer.stats.latency(now) == slow_peer.stats.default_latency
+
+
+@pytest.mark.gen_test
+def test_hedge_peer_refuses_connection():
+    slow = server('slow', 0.1)
+
+    sock = socket.socket()
+    sock.bind(('localhost', 0))
+    dead_hostport = 'localhost:%d' % sock.getsockname()[1]
+    sock.close()
+
+    tchannel = TChannel(name='test')
+    tchannel.peers.get(slow.hostport).state = PreferredState()
+    dead = tchannel.peers.get(dead_hostport)
+    dead.breaker = CircuitBreaker(max_failures=1)
+
+    response = yield tchannel.request(service='server').send(
+        'endpoint', '', '', ttl=1, hedge_delay=0.05,
+    )
+    body = yield response.get_body()
+
+    # The original request still answers, and the dead peer is blamed.
+    assert body == 'slow'
+    assert dead.breaker.is_open
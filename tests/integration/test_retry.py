@@ -20,8 +20,10 @@
 
 from __future__ import absolute_import
 
+import mock
 import pytest
 from tchannel.event import EventHook
+from tchannel.event import EventType
 from tchannel.tornado.peer import PeerState
 import tornado
 import tornado.gen
@@ -212,3 +214,33 @@ def test_should_retry_on_error(retry_flag, error_code, result):
 
     error = TChannelError.from_code(error_code, description="retry")
     assert request.should_retry_on_error(error) == result
+
+
+@pytest.mark.gen_test
+def test_retry_denied_by_budget():
+    endpoint = b'tchannelretrytest'
+    tchannel = chain(3, endpoint)
+    tchannel.retry_budget = retry.RetryBudget(
+        ratio=0, min_per_second=1, max_tokens=1,
+    )
+    hook = mock.Mock()
+    tchannel.hooks.register(hook, EventType.on_retry_denied)
+
+    with pytest.raises(BusyError):
+        yield tchannel.request(
+            score_threshold=0
+        ).send(
+            endpoint,
+            "test",
+            "test",
+            headers={
+                're': retry.CONNECTION_ERROR_AND_TIMEOUT
+            },
+            ttl=0.02,
+            retry_limit=2,
+        )
+
+    # The budget allowed only one of the two retries.
+    assert hook.call_count == 1
+    request, error = hook.call_args[0]
+    assert error.code == ErrorCode.busy
@@ -0,0 +1,91 @@
+# Copyright (c) 2015 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from __future__ import absolute_import
+
+import os
+import tempfile
+
+import pytest
+from tornado import gen
+
+from tchannel.messages.common import MAX_PAYLOAD_SIZE
+from tchannel.tornado.stream import FileStream
+from tchannel.tornado.stream import read_into_file
+from tchannel.tornado.tchannel import TChannel
+
+
+@pytest.mark.gen_test
+def test_send_and_receive_file():
+    data = os.urandom(MAX_PAYLOAD_SIZE * 3)
+
+    server = TChannel('server', 'localhost:0')
+    server.listen()
+
+    received = tempfile.TemporaryFile()
+
+    @server.register('upload')
+    @gen.coroutine
+    def upload(request, response):
+        written = yield read_into_file(request.get_body_s(), received.fileno())
+        yield response.write_body(str(written))
+
+    with tempfile.NamedTemporaryFile() as f:
+        f.write(data)
+        f.flush()
+
+        client = TChannel('client')
+        response = yield client.request(server.hostport).send(
+            'upload', '', FileStream(os.open(f.name, os.O_RDONLY),
+                                     auto_close=True),
+        )
+
+    body = yield response.get_body()
+    assert body == str(len(data))
+
+    received.seek(0)
+    assert received.read() == data
+    received.close()
+
+
+@pytest.mark.gen_test
+def test_respond_with_file():
+    data = os.urandom(MAX_PAYLOAD_SIZE * 3 + 100)
+
+    with tempfile.NamedTemporaryFile() as f:
+        f.write(data)
+        f.flush()
+
+        server = TChannel('server', 'localhost:0')
+        server.listen()
+
+        @server.register('download')
+        def download(request, response):
+            response.set_body_s(
+                FileStream(os.open(f.name, os.O_RDONLY), auto_close=True)
+            )
+
+        client = TChannel('client')
+        response = yield client.request(server.hostport).send(
+            'download', '', '',
+        )
+        body = yield response.get_body()
+
+    assert body == data
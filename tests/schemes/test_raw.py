@@ -23,9 +23,12 @@ from __future__ import (
 )
 
 import pytest
+from tornado import gen
 
 from tchannel import TChannel, Request, Response, schemes
+from tchannel.event import EventType
 from tchannel.response import TransportHeaders
+from tchannel.tornado.cache import LRUCache
 
 
 @pytest.mark.gen_test
@@ -95,3 +98,89 @@ def test_register_should_work_with_different_endpoint():
     )
 
     assert resp.body == 'resp body'
+
+
+@pytest.mark.gen_test
+@pytest.mark.call
+def test_streaming_endpoint():
+
+    # Given this test server:
+
+    server = TChannel(name='server')
+
+    @server.raw.register('upload', streaming=True)
+    @gen.coroutine
+    def endpoint(request):
+        assert request.headers == b'req headers'
+
+        sizes = []
+        for chunk_future in request.body:
+            chunk = yield chunk_future
+            sizes.append(len(chunk))
+
+        def chunks():
+            for size in sizes:
+                yield b'%d\n' % size
+
+        raise gen.Return(Response(chunks(), headers=b'resp headers'))
+
+    server.listen()
+
+    # Make a call with a body that spans several frames:
+
+    tchannel = TChannel(name='client')
+    body = b'a' * 200000
+
+    resp = yield tchannel.raw(
+        service='server',
+        endpoint='upload',
+        headers=b'req headers',
+        body=body,
+        hostport=server.hostport,
+    )
+
+    assert resp.headers == b'resp headers'
+    sizes = [int(line) for line in resp.body.splitlines()]
+    assert len(sizes) > 1
+    assert sum(sizes) == len(body)
+
+
+@pytest.mark.gen_test
+@pytest.mark.call
+def test_cached_endpoint():
+
+    # Given this test server:
+
+    server = TChannel(name='server')
+    calls = []
+    events = []
+
+    @server.raw.register('lookup', cache=LRUCache(maxsize=10))
+    def endpoint(request):
+        calls.append(request.body)
+        return Response(b'value of ' + request.body, headers=b'resp headers')
+
+    server.hooks.register(
+        lambda request: events.append('hit'), EventType.on_cache_hit
+    )
+    server.hooks.register(
+        lambda request: events.append('miss'), EventType.on_cache_miss
+    )
+    server.listen()
+
+    # Make the same call twice, then a different one:
+
+    tchannel = TChannel(name='client')
+
+    for body in (b'a', b'a', b'b'):
+        resp = yield tchannel.raw(
+            service='server',
+            endpoint='lookup',
+            body=body,
+            hostport=server.hostport,
+        )
+        assert resp.headers == b'resp headers'
+        assert resp.body == b'value of ' + body
+
+    assert calls == [b'a', b'b']
+    assert events == ['miss', 'hit', 'miss']
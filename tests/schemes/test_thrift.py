@@ -43,6 +43,7 @@ from tchannel.sync import TChannel as SyncTChannel
 from tchannel.sync.thrift import client_for as sync_client_for
 from tchannel.thrift import client_for
 from tchannel.tornado import TChannel as DeprecatedTChannel
+from tchannel.tornado.cache import LRUCache
 from tchannel.testing.data.generated.ThriftTest import (
     SecondService as _SecondService,
     ThriftTest as _ThriftTest,
@@ -255,6 +256,30 @@ def test_string(server, service, ThriftTest):
     assert resp.body == 'howdy'
 
 
+@pytest.mark.gen_test
+@pytest.mark.call
+def test_cached_endpoint(server, service, ThriftTest):
+
+    # Given this test server:
+
+    calls = []
+
+    @server.thrift.register(ThriftTest, cache=LRUCache(maxsize=10))
+    def testString(request):
+        calls.append(request.body.thing)
+        return 'value of ' + request.body.thing
+
+    # Make the same call twice, then a different one:
+
+    tchannel = TChannel(name='client')
+
+    for thing in ('a', 'a', 'b'):
+        resp = yield tchannel.thrift(service.testString(thing))
+        assert resp.body == 'value of ' + thing
+
+    assert calls == ['a', 'b']
+
+
 @pytest.mark.gen_test
 @pytest.mark.call
 def test_byte(server, service, ThriftTest):
@@ -20,9 +20,12 @@
 
 from __future__ import absolute_import
 
+import struct
+
 import pytest
 
 from tchannel import messages
+from tchannel.errors import ReadError
 from tchannel.frame import Frame
 from tchannel.frame import FrameHeader
 from tchannel.frame import frame_rw
@@ -90,3 +93,98 @@ def test_decode_with_message_length(dummy_frame):
     )
     message_rw = messages.RW[f.header.message_type]
     message_rw.read(BytesIO(f.payload)) == PingRequestMessage()
+
+
+def test_read_buffer():
+    """Verify frames are read out of data without copying their payload."""
+    frames = [
+        Frame(header=FrameHeader(message_type=0x30, message_id=i),
+              payload=str(i) * 10)
+        for i in range(3)
+    ]
+    stream = BytesIO()
+    for f in frames:
+        frame_rw.write(f, stream)
+    data = stream.getvalue()
+
+    offset = 0
+    for expected in frames:
+        f, size = frame_rw.read_buffer(data, offset)
+        assert size == 26
+        assert f.header == expected.header
+        assert isinstance(f.payload, buffer)
+        assert str(f.payload) == expected.payload
+        offset += size
+
+    assert offset == len(data)
+    assert frame_rw.read_buffer(data, offset) is None
+
+
+@pytest.mark.parametrize('length', [0, 1, 2, 16, 25])
+def test_read_buffer_incomplete(length):
+    data = frame_rw.write(
+        Frame(header=FrameHeader(message_type=0x30, message_id=1),
+              payload='x' * 10),
+        BytesIO(),
+    ).getvalue()
+    assert frame_rw.read_buffer(data[:length]) is None
+
+
+def test_read_buffer_invalid_size(dummy_frame):
+    dummy_frame[1] = 15
+    with pytest.raises(ReadError):
+        frame_rw.read_buffer(bytes(dummy_frame))
+
+
+def test_read_message_from_buffer(dummy_frame):
+    dummy_frame[2] = Types.PING_REQ
+    f, _ = frame_rw.read_buffer(bytes(dummy_frame))
+    message_rw = messages.RW[f.header.message_type]
+    assert message_rw.read(BytesIO(f.payload)) == PingRequestMessage()
+
+
+def test_write_message():
+    """Verify frames can be written without serializing payloads first."""
+    message = PingRequestMessage()
+    message_rw = messages.RW[message.message_type]
+    header = FrameHeader(message_type=message.message_type, message_id=42)
+
+    stream = BytesIO()
+    stream.write('existing')
+    frame_rw.write_message(header, message_rw, message, stream)
+    frame_rw.write_message(header, message_rw, message, stream)
+
+    expected = frame_rw.write(
+        Frame(header=header, payload=''), BytesIO()
+    ).getvalue()
+    assert stream.getvalue() == 'existing' + expected * 2
+
+
+def test_write_message_failure():
+    """Verify a payload that fails to serialize leaves no partial frame."""
+    header = FrameHeader(message_type=0x30, message_id=42)
+
+    stream = BytesIO()
+    stream.write('existing')
+    with pytest.raises(AttributeError):
+        frame_rw.write_message(header, messages.call_req_rw, None, stream)
+
+    assert stream.getvalue() == 'existing'
+
+
+def test_write_message_too_large():
+    """Verify a frame too large for its size field leaves no partial frame."""
+    header = FrameHeader(message_type=0x30, message_id=42)
+
+    class LargePayloadWriter(object):
+        def write(self, payload, stream):
+            stream.write(payload)
+
+    stream = BytesIO()
+    stream.write('existing')
+    with pytest.raises(struct.error):
+        frame_rw.write_message(
+            header, LargePayloadWriter(), 'a' * 0x10000, stream
+        )
+
+    assert stream.getvalue() == 'existing'
@@ -93,3 +93,38 @@ def test_build_response():
     assert req.flags == message.flags
     assert req.headers == message.headers
     assert req.id == message.id
+
+
+def test_build_complete_message_has_completed_args():
+    message_factory = MessageFactory()
+    message = CallRequestMessage(
+        flags=FlagsType.none,
+        service="test",
+        headers={},
+        args=["endpoint", "header", "body"],
+        id=12,
+    )
+
+    req = message_factory.build(message)
+    assert 12 not in message_factory.message_buffer
+    assert [s.state for s in req.argstreams] == [StreamState.completed] * 3
+    assert [s.read_nowait() for s in req.argstreams] == [
+        "endpoint", "header", "body",
+    ]
+
+
+def test_build_fragmented_message_leaves_last_arg_open():
+    message_factory = MessageFactory()
+    message = CallRequestMessage(
+        flags=FlagsType.fragment,
+        service="test",
+        headers={},
+        args=["endpoint", "hea"],
+        id=12,
+    )
+
+    req = message_factory.build(message)
+    assert message_factory.message_buffer[12] is req
+    assert req.argstreams[0].state == StreamState.completed
+    assert req.argstreams[1].state != StreamState.completed
+    assert req.argstreams[2].state != StreamState.completed
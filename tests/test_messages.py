@@ -28,6 +28,7 @@ from tchannel import messages
 from tchannel.io import BytesIO
 from tchannel.messages import CallRequestMessage
 from tchannel.messages.common import PROTOCOL_VERSION
+from tchannel.messages.common import compute_checksum
 from tchannel.tornado.message_factory import MessageFactory
 from tests.util import big_arg
 
@@ -280,3 +281,33 @@ def test_message_fragment(arg2, arg3, connection):
     body = yield recv_msg.get_body()
     assert header == origin_msg.args[1]
     assert body == origin_msg.args[2]
+
+
+def test_message_fragment_references_args(connection):
+    arg3 = big_arg()
+    msg = CallRequestMessage(
+        args=["", "", arg3],
+        checksum=(messages.ChecksumType.crc32, 0),
+    )
+    fragments = list(MessageFactory(connection).fragment(msg))
+    assert len(fragments) > 2
+
+    # Fragments of arg3 are windows into it instead of copies.
+    pieces = [fragment.args[-1] for fragment in fragments]
+    assert all(isinstance(piece, buffer) for piece in pieces)
+    assert b''.join(map(bytes, pieces)) == arg3
+
+    # The checksum is accumulated across fragments.
+    assert fragments[-1].checksum[1] == compute_checksum(
+        messages.ChecksumType.crc32, ["", "", arg3]
+    )
+
+
+def test_message_fragment_encodes_unicode_args(connection):
+    arg3 = u'\xe9' * 0x10000
+    msg = CallRequestMessage(args=["", "", arg3])
+    fragments = list(MessageFactory(connection).fragment(msg))
+    assert len(fragments) > 1
+
+    pieces = [fragment.args[-1] for fragment in fragments]
+    assert b''.join(map(bytes, pieces)) == arg3.encode('utf-8')
@@ -0,0 +1,61 @@
+# Copyright (c) 2015 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from __future__ import absolute_import
+
+from tchannel.retry import RetryBudget
+
+
+def test_retry_budget_reserve():
+    budget = RetryBudget(ratio=0.5, min_per_second=2, max_tokens=10)
+
+    # Starts out with a second worth of retries.
+    assert budget.can_retry(0)
+    budget.withdraw()
+    assert budget.can_retry(0)
+    budget.withdraw()
+    assert not budget.can_retry(0)
+
+    # Refills over time.
+    assert budget.can_retry(0.5)
+
+
+def test_retry_budget_successes():
+    budget = RetryBudget(ratio=0.5, min_per_second=0, max_tokens=10)
+    assert not budget.can_retry(0)
+
+    budget.record_success(0)
+    assert not budget.can_retry(0)
+    budget.record_success(0)
+    assert budget.can_retry(0)
+    budget.withdraw()
+    assert not budget.can_retry(0)
+
+
+def test_retry_budget_max_tokens():
+    budget = RetryBudget(ratio=1, min_per_second=1, max_tokens=2)
+    for _ in range(10):
+        budget.record_success(0)
+
+    # Only two retries were saved up, no matter how long we wait.
+    assert budget.can_retry(1000)
+    budget.withdraw()
+    budget.withdraw()
+    assert not budget.can_retry(1000)
@@ -248,6 +248,60 @@ def test_instance_ignore():
     ).getvalue() == bytearray([1, 0, 42, 2])
 
 
+Inner = namedtuple('Inner', ['a', 'b'])
+Outer = namedtuple('Outer', ['x', 'c', 'inner', 'empty', 's', 'y', 'z'])
+
+
+def test_instance_fixed_width_runs():
+    inner_rw = rw.instance(Inner, ('a', rw.number(8)), ('b', rw.number(1)))
+    c_rw = rw.instance(
+        Outer,
+        ('x', rw.number(1)),
+        (rw.skip, rw.constant(rw.number(2), 0)),
+        ('c', rw.constant(rw.number(1), 42)),
+        ('inner', inner_rw),
+        ('empty', rw.instance(NoArgsConstructor)),
+        ('s', rw.len_prefixed_string(rw.number(1))),
+        ('y', rw.number(4)),
+        ('z', rw.number(2)),
+    )
+    obj = Outer(1, 42, Inner(2, 3), NoArgsConstructor(), 'hi', 4, 5)
+    bs = (
+        [1, 0, 0, 42, 0, 0, 0, 0, 0, 0, 0, 2, 3] +
+        [2] + list('hi') +
+        [0, 0, 0, 4, 0, 5]
+    )
+
+    assert c_rw.read(bio(bs)) == obj
+    assert c_rw.write(obj, BytesIO()).getvalue() == bytearray(bs)
+    assert c_rw.width() == 20
+    assert c_rw.length(obj) == len(bs)
+
+    with pytest.raises(ReadError):
+        c_rw.read(bio(bs[:5]))
+
+
+@given([(number_width, int)])
+def test_instance_matches_dictionary(items):
+    # Instances pack runs of numbers into a single struct. The output must
+    # match dictionaries, which read and write one field at a time.
+    names = ['f%d' % i for i in range(len(items))]
+    cls = namedtuple('Fields', names)
+    pairs = [
+        (name, rw.number(width)) for name, (width, _) in zip(names, items)
+    ]
+    values = dict(
+        (name, num % (2 ** (width * 8 - 1)))
+        for name, (width, num) in zip(names, items)
+    )
+
+    expected = rw.dictionary(*pairs).write(values, BytesIO()).getvalue()
+    i_rw = rw.instance(cls, *pairs)
+
+    assert i_rw.write(cls(**values), BytesIO()).getvalue() == expected
+    assert i_rw.read(bio(expected)) == cls(**values)
+
+
 @pytest.mark.parametrize('l_rw, k_rw, v_rw, headers, bs', [
     (rw.number(1), rw.len_prefixed_string(rw.number(1)), None, [], [0]),
     (rw.number(1), rw.len_prefixed_string(rw.number(1)), None, [
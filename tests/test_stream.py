@@ -21,14 +21,21 @@
 from __future__ import absolute_import
 
 import os
+import tempfile
 
 import pytest
 
 from tchannel.errors import UnexpectedError
 from tchannel.errors import TChannelError
 from tchannel.tornado import Response
+from tchannel.messages.common import MAX_PAYLOAD_SIZE
+from tchannel.messages.common import StreamState
+from tchannel.tornado.stream import FileStream
 from tchannel.tornado.stream import InMemStream
 from tchannel.tornado.stream import PipeStream
+from tchannel.tornado.stream import read_full
+from tchannel.tornado.stream import read_into
+from tchannel.tornado.stream import read_into_file
 
 
 @pytest.mark.gen_test
@@ -51,6 +58,76 @@ def test_InMemStream():
         yield stream.write("4")
 
 
+def test_InMemStream_read_nowait():
+    stream = InMemStream("1")
+    stream.write(buffer("23"))
+    assert stream.read_nowait() is None
+    assert not stream.drained()
+
+    stream.close()
+    assert not stream.drained()
+    assert stream.read_nowait() == "123"
+    assert stream.drained()
+    assert stream.read_nowait() == ""
+
+    # Nobody had to wait, so no Condition was needed.
+    assert stream._condition is None
+
+
+def test_read_full_completed_stream_resolves_immediately():
+    stream = InMemStream("abc")
+    stream.close()
+
+    future = read_full(stream)
+    assert future.done()
+    assert future.result() == "abc"
+
+
+@pytest.mark.gen_test
+def test_InMemStream_read_joins_many_pieces():
+    stream = InMemStream()
+    for i in range(1000):
+        stream.write(buffer("%03d" % i))
+
+    chunk = yield stream.read()
+    assert chunk == "".join("%03d" % i for i in range(1000))
+    assert len(stream._stream) == 0
+
+
+@pytest.mark.gen_test
+def test_read_into():
+    stream = InMemStream()
+    stream.write("ab")
+    stream.write("cd")
+    stream.close()
+
+    buf = bytearray("0")
+    result = yield read_into(stream, buf)
+    assert result is buf
+    assert buf == bytearray("0abcd")
+
+
+@pytest.mark.gen_test
+def test_InMemStream_max_size():
+    stream = InMemStream(max_size=4)
+
+    write_future = stream.write("ab")
+    assert write_future.done()
+
+    # The stream is full now.
+    write_future = stream.write("cd")
+    assert not write_future.done()
+
+    chunk = yield stream.read()
+    assert chunk == "abcd"
+    yield write_future
+
+    write_future = stream.write("efgh")
+    assert not write_future.done()
+    stream.close()
+    yield write_future
+
+
 @pytest.mark.gen_test
 def test_PipeStream():
     r, w = os.pipe()
@@ -69,6 +146,100 @@ def test_PipeStream():
         yield stream.write("4")
 
 
+@pytest.yield_fixture
+def data_file():
+    data = os.urandom(MAX_PAYLOAD_SIZE * 2 + 100)
+    with tempfile.NamedTemporaryFile() as f:
+        f.write(data)
+        f.flush()
+        yield f.name, data
+
+
+@pytest.mark.gen_test
+def test_FileStream(data_file):
+    path, data = data_file
+    stream = FileStream(os.open(path, os.O_RDONLY), auto_close=True)
+
+    chunk = yield stream.read()
+    assert isinstance(chunk, buffer)
+    assert len(chunk) == MAX_PAYLOAD_SIZE
+
+    chunks = [chunk]
+    while chunk:
+        chunk = yield stream.read()
+        chunks.append(chunk)
+    assert stream.state == StreamState.completed
+
+    # The chunks stay valid until the stream is closed.
+    assert "".join(bytes(chunk) for chunk in chunks) == data
+
+    stream.close()
+    assert stream._mmap is None
+    assert stream._fd is None
+
+    with pytest.raises(UnexpectedError):
+        stream.write("a")
+
+
+@pytest.mark.gen_test
+def test_FileStream_offset_and_length(data_file):
+    path, data = data_file
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        for offset, length in ((10, 20), (len(data) - 5, None)):
+            stream = FileStream(fd, offset=offset, length=length)
+            try:
+                contents = yield read_full(stream)
+            finally:
+                stream.close()
+
+            end = None if length is None else offset + length
+            assert contents == data[offset:end]
+            assert stream._mmap is None
+
+        # Without auto_close, the descriptor is left open.
+        os.fstat(fd)
+    finally:
+        os.close(fd)
+
+
+def test_FileStream_close_before_read(data_file):
+    path, _ = data_file
+    stream = FileStream(os.open(path, os.O_RDONLY), auto_close=True)
+    fd = stream._fd
+
+    # Flushing a response doesn't release it; it still has to be sent.
+    response = Response(argstreams=[InMemStream(), InMemStream(), stream])
+    response.flush()
+    assert stream._mmap is not None
+
+    stream.close()
+    assert stream._mmap is None
+    with pytest.raises(OSError):
+        os.fstat(fd)
+
+
+@pytest.mark.gen_test
+def test_FileStream_empty_file():
+    with tempfile.NamedTemporaryFile() as f:
+        contents = yield read_full(FileStream(f.fileno()))
+    assert contents == ""
+
+
+@pytest.mark.gen_test
+def test_read_into_file():
+    stream = InMemStream()
+    stream.write("a" * 10)
+    stream.write("b" * 10)
+    stream.close()
+
+    with tempfile.TemporaryFile() as f:
+        written = yield read_into_file(stream, f.fileno())
+        assert written == 20
+        f.seek(0)
+        assert f.read() == "a" * 10 + "b" * 10
+
+
 @pytest.mark.gen_test
 def test_response_exception():
     resp = Response()
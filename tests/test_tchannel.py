@@ -37,6 +37,9 @@ from tchannel import TChannel, Request, Response, schemes, errors
 from tchannel.errors import AlreadyListeningError
 from tchannel.event import EventHook
 from tchannel.response import TransportHeaders
+from tchannel.retry import RetryBudget
+from tchannel.tornado.peer import ConsistentHashChooser
+from tchannel.tornado.peer import LeastPendingScorer
 
 # TODO - need integration tests for timeout and retries, use testing.vcr
 
@@ -52,6 +55,29 @@ def test_should_have_default_schemes():
         assert isinstance(scheme, f)
 
 
+def test_peer_selection_and_retry_options_reach_the_channel():
+    chooser = ConsistentHashChooser()
+    scorer = LeastPendingScorer()
+    budget = RetryBudget()
+    service_budgets = {'server': RetryBudget()}
+
+    tchannel = TChannel(
+        name='test',
+        peer_chooser=chooser,
+        peer_scorer=scorer,
+        retry_budget=budget,
+        service_retry_budgets=service_budgets,
+        retry_backoff=0.1,
+    )
+
+    dep_tchannel = tchannel._dep_tchannel
+    assert dep_tchannel.peers.chooser is chooser
+    assert dep_tchannel.peers.scorer is scorer
+    assert dep_tchannel.retry_budget is budget
+    assert dep_tchannel.service_retry_budgets is service_budgets
+    assert dep_tchannel.retry_backoff == 0.1
+
+
 @pytest.mark.gen_test
 @pytest.mark.call
 def test_call_should_get_response():
@@ -95,6 +121,65 @@ def test_call_should_get_response():
     assert resp.transport.failure_domain is None
 
 
+@pytest.mark.gen_test
+@pytest.mark.call
+def test_shard_key_routes_to_the_same_server():
+    servers = []
+    for name in ('a', 'b', 'c'):
+        server = TChannel(name='server')
+
+        @server.register(scheme=schemes.RAW, endpoint='endpoint')
+        def endpoint(request, name=name):
+            return name
+
+        server.listen()
+        servers.append(server)
+
+    tchannel = TChannel(
+        name='client',
+        known_peers=[server.hostport for server in servers],
+        peer_chooser=ConsistentHashChooser(),
+    )
+
+    bodies = set()
+    for _ in range(5):
+        resp = yield tchannel.call(
+            scheme=schemes.RAW,
+            service='server',
+            arg1='endpoint',
+            shard_key='some-key',
+        )
+        bodies.add(resp.body)
+
+    assert len(bodies) == 1
+
+
+@pytest.mark.gen_test
+@pytest.mark.call
+def test_call_through_subchannel():
+    server = TChannel(name='server')
+
+    @server.register(scheme=schemes.RAW)
+    def endpoint(request):
+        return 'hello'
+
+    server.listen()
+
+    tchannel = TChannel(name='client')
+    subchannel = tchannel.subchannel('server', known_peers=[server.hostport])
+    assert tchannel.subchannel('server') is subchannel
+
+    resp = yield tchannel.call(
+        scheme=schemes.RAW,
+        service='server',
+        arg1='endpoint',
+    )
+    assert resp.body == 'hello'
+
+    # The call only considered the subchannel's peers.
+    assert not tchannel._dep_tchannel.peers.hosts
+
+
 def test_uninitialized_tchannel_is_fork_safe():
     """TChannel('foo') should not schedule any work on the io loop."""
 
@@ -0,0 +1,145 @@
+# Copyright (c) 2015 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from __future__ import absolute_import
+
+from tchannel.tornado.breaker import CircuitBreaker
+
+
+def test_trips_on_consecutive_failures():
+    breaker = CircuitBreaker(max_failures=3, backoff=1)
+
+    breaker.record_failure(10, 9)
+    breaker.record_failure(10, 9)
+    assert breaker.available(10)
+
+    breaker.record_failure(10, 9)
+    assert breaker.is_open
+    assert not breaker.available(10.5)
+    assert breaker.available(11)
+
+
+def test_successes_reset_consecutive_failures():
+    breaker = CircuitBreaker(max_failures=2)
+
+    for _ in range(5):
+        breaker.record_failure(10, 9)
+        breaker.record_success(9)
+
+    assert not breaker.is_open
+
+
+def test_trips_on_error_ratio():
+    breaker = CircuitBreaker(max_failures=10, max_error_ratio=0.5, window=4)
+
+    breaker.record_success(9)
+    breaker.record_failure(10, 9)
+    breaker.record_success(9)
+    assert not breaker.is_open
+
+    breaker.record_failure(10, 9)
+    assert breaker.is_open
+
+
+def test_half_open_probing():
+    breaker = CircuitBreaker(max_failures=1, backoff=1, max_backoff=3)
+    breaker.record_failure(10, 9)
+    assert not breaker.available(10)
+
+    # Only one probe at a time.
+    assert breaker.available(11)
+    assert breaker.before_request(11)
+    assert not breaker.available(11)
+
+    # Failed probes back off exponentially.
+    breaker.record_failure(11, 11, probe=True)
+    assert not breaker.available(12.5)
+    assert breaker.available(13)
+    assert breaker.before_request(13)
+    breaker.record_failure(13, 13, probe=True)
+    assert not breaker.available(15.5)
+    assert breaker.available(16)
+
+    # A successful probe closes the breaker.
+    assert breaker.before_request(16)
+    breaker.record_success(16, probe=True)
+    assert not breaker.is_open
+    assert breaker.available(16)
+
+    breaker.record_failure(16, 16)
+    assert not breaker.available(16.5)
+    assert breaker.available(17)
+
+
+def test_abandoned_probe():
+    breaker = CircuitBreaker(max_failures=1, backoff=1)
+    breaker.record_failure(10, 9)
+    breaker.before_request(11)
+
+    assert not breaker.available(11.5)
+    assert breaker.available(12)
+
+
+def test_only_the_probe_decides():
+    breaker = CircuitBreaker(max_failures=1, backoff=1)
+    breaker.record_failure(10, 9)
+
+    # Late outcomes of requests sent before the breaker tripped are ignored.
+    breaker.record_success(9.5)
+    assert breaker.is_open
+    breaker.record_failure(10.5, 9.5)
+    assert breaker.available(11)
+
+    assert breaker.before_request(11)
+
+    # So are outcomes of requests sent while the probe is in flight.
+    assert not breaker.before_request(11.2)
+    breaker.record_success(11.2)
+    assert breaker.is_open
+    breaker.record_failure(11.3, 11.2)
+    assert not breaker.available(11.5)
+
+    breaker.record_success(11, probe=True)
+    assert not breaker.is_open
+
+
+def test_reserved_probe():
+    breaker = CircuitBreaker(max_failures=1, backoff=1)
+    breaker.record_failure(10, 9)
+
+    breaker.reserve_probe(11)
+    assert not breaker.available(11)
+
+    # The request that reserved the probe gets to send it.
+    assert breaker.before_request(11.5)
+    assert not breaker.before_request(11.6)
+
+
+def test_released_probe():
+    breaker = CircuitBreaker(max_failures=1, backoff=1)
+    breaker.record_failure(10, 9)
+
+    assert breaker.before_request(11)
+    assert not breaker.available(11)
+
+    # The breaker stays open, but another probe may go out.
+    breaker.release_probe(True)
+    assert breaker.is_open
+    assert breaker.available(11)
@@ -0,0 +1,69 @@
+# Copyright (c) 2015 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from __future__ import absolute_import
+
+from tchannel.tornado.cache import LRUCache
+
+
+def test_get_and_set():
+    cache = LRUCache(maxsize=2)
+
+    assert cache.get('a', 0) is None
+    cache.set('a', 1, 0)
+    assert cache.get('a', 0) == 1
+
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1, 0)
+    cache.set('b', 2, 0)
+
+    # 'a' is now the most recently used.
+    assert cache.get('a', 0) == 1
+
+    cache.set('c', 3, 0)
+    assert len(cache) == 2
+    assert 'b' not in cache
+    assert cache.get('a', 0) == 1
+    assert cache.get('c', 0) == 3
+    assert cache.evictions == 1
+
+
+def test_entries_expire():
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.set('a', 1, 100)
+
+    assert cache.get('a', 109) == 1
+    assert cache.get('a', 110) is None
+    assert 'a' not in cache
+    assert cache.misses == 1
+
+
+def test_set_replaces_entry():
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.set('a', 1, 0)
+    cache.set('a', 2, 5)
+
+    assert len(cache) == 1
+    assert cache.get('a', 12) == 2
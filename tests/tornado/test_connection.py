@@ -20,11 +20,23 @@
 
 from __future__ import absolute_import
 
+import mock
 import pytest
+import tornado.gen
 import tornado.ioloop
 import tornado.testing
 
+from tchannel import frame
+from tchannel import messages
+from tchannel.errors import CanceledError
+from tchannel.errors import TimeoutError
+from tchannel.io import BytesIO
+from tchannel.messages import CallRequestMessage
+from tchannel.messages import CallResponseMessage
 from tchannel.messages import Types
+from tchannel.messages.common import FlagsType
+from tchannel.tornado.request import Request
+from tchannel.tornado.stream import InMemStream
 
 
 def dummy_headers():
@@ -39,6 +51,11 @@ class ConnectionTestCase(tornado.testing.AsyncTestCase):
     def make_server_client(self, tornado_pair):
         self.server, self.client = tornado_pair
 
+    def get_new_ioloop(self):
+        # The connections are created by the tornado_pair fixture before the
+        # test's IOLoop is set up, so they are bound to the global IOLoop.
+        return tornado.ioloop.IOLoop.instance()
+
     @tornado.testing.gen_test
     def test_handshake(self):
         """Verify we handshake in an async manner."""
@@ -61,3 +78,214 @@ class ConnectionTestCase(tornado.testing.AsyncTestCase):
 
         pong = yield self.client.await()
         assert pong.message_type == Types.PING_RES
+
+
+def _serialize(message):
+    payload = messages.RW[message.message_type].write(
+        message, BytesIO()
+    ).getvalue()
+    f = frame.Frame(
+        header=frame.FrameHeader(
+            message_type=message.message_type,
+            message_id=message.id,
+        ),
+        payload=payload,
+    )
+    return frame.frame_rw.write(f, BytesIO()).getvalue()
+
+
+@pytest.mark.gen_test
+def test_read_many_frames_in_one_chunk(io_loop, tornado_pair):
+    """Verify all frames in a single chunk are processed."""
+    server, client = tornado_pair
+    headers = dummy_headers()
+    client.initiate_handshake(headers=headers)
+    yield server.expect_handshake(headers=headers)
+
+    data = b''.join(
+        _serialize(CallRequestMessage(service='foo', id=i))
+        for i in range(1, 6)
+    )
+    yield client.connection.write(data)
+
+    for i in range(1, 6):
+        message = yield server.await()
+        assert message.id == i
+        assert message.service == 'foo'
+
+
+@pytest.mark.gen_test
+def test_read_frame_split_across_chunks(io_loop, tornado_pair):
+    """Verify partial frames are buffered until they are complete."""
+    server, client = tornado_pair
+    headers = dummy_headers()
+    client.initiate_handshake(headers=headers)
+    yield server.expect_handshake(headers=headers)
+
+    data = _serialize(
+        CallRequestMessage(service='foo', args=['a', 'b', 'c'], id=42)
+    )
+    yield client.connection.write(data[:1])
+    yield tornado.gen.moment
+    yield client.connection.write(data[1:20])
+    yield tornado.gen.moment
+    yield client.connection.write(data[20:])
+
+    message = yield server.await()
+    assert message.id == 42
+    assert message.args == ['a', 'b', 'c']
+
+
+@pytest.mark.gen_test
+def test_writes_in_same_tick_are_coalesced(io_loop, tornado_pair):
+    server, client = tornado_pair
+    headers = dummy_headers()
+    client.initiate_handshake(headers=headers)
+    yield server.expect_handshake(headers=headers)
+
+    futures = [
+        client.write(CallRequestMessage(service='foo', id=i))
+        for i in range(1, 6)
+    ]
+    assert len(set(futures)) == 1
+    yield futures
+
+    for i in range(1, 6):
+        message = yield server.await()
+        assert message.id == i
+
+    assert client.frames_per_flush[5] == 1
+
+
+@pytest.mark.gen_test
+def test_write_flushes_at_high_water_mark(io_loop, tornado_pair):
+    server, client = tornado_pair
+    headers = dummy_headers()
+    client.initiate_handshake(headers=headers)
+    yield server.expect_handshake(headers=headers)
+
+    client.write_high_water_mark = 1
+    yield [
+        client.write(CallRequestMessage(service='foo', id=i))
+        for i in range(1, 4)
+    ]
+
+    for i in range(1, 4):
+        message = yield server.await()
+        assert message.id == i
+
+    assert client.frames_per_flush[1] >= 3
+
+
+@pytest.mark.gen_test
+def test_request_times_out(io_loop, tornado_pair):
+    server, client = tornado_pair
+    headers = dummy_headers()
+    handshake = client.initiate_handshake(headers=headers)
+    yield server.expect_handshake(headers=headers)
+    yield handshake
+
+    request = Request(
+        id=client.next_message_id(),
+        ttl=0.02,
+        argstreams=[InMemStream('a'), InMemStream(), InMemStream()],
+    )
+    with pytest.raises(TimeoutError):
+        yield client.send_request(request)
+
+    # Late responses for the request are still recognized.
+    assert request.id in client._outstanding
+    assert len(client._timeouts) == 0
+
+    client.remove_outstanding_request(request)
+    assert request.id not in client._outstanding
+
+
+@pytest.mark.gen_test
+def test_response_cancels_timeout(io_loop, tornado_pair):
+    server, client = tornado_pair
+    headers = dummy_headers()
+    handshake = client.initiate_handshake(headers=headers)
+    yield server.expect_handshake(headers=headers)
+    yield handshake
+
+    request = Request(
+        id=client.next_message_id(),
+        ttl=10,
+        argstreams=[InMemStream('a'), InMemStream(), InMemStream()],
+    )
+    response_future = client.send_request(request)
+    assert request.id in client._timeouts
+
+    message = yield server.await()
+    yield server.write(CallResponseMessage(id=message.id, args=['', '', '']))
+
+    yield response_future
+    assert len(client._timeouts) == 0
+
+
+@pytest.mark.gen_test
+def test_close_callback(io_loop, tornado_pair):
+    server, client = tornado_pair
+    callback = mock.Mock()
+    client.set_close_callback(callback)
+    assert client.idle
+
+    client.close()
+    yield tornado.gen.sleep(0.01)
+
+    assert client.closed
+    callback.assert_called_once_with()
+
+
+def test_cancel_marks_incoming_call_cancelled(tornado_pair):
+    server, _ = tornado_pair
+    request = mock.MagicMock(cancelled=False)
+    response = mock.MagicMock(cancelled=False)
+    server.incoming_calls[42] = (request, response)
+
+    server._handle_message(messages.CancelMessage(why='timeout', id=42))
+
+    assert request.cancelled
+    assert response.cancelled
+
+    # Handlers that are still reading the request fail.
+    (error,), _ = request.set_exception.call_args
+    assert isinstance(error, CanceledError)
+
+    # CANCEL frames are handled right away and never queued up.
+    assert server._messages.qsize() == 0
+
+
+def test_cancel_for_finished_call(tornado_pair):
+    server, _ = tornado_pair
+
+    # Nothing to do if the call is already done.
+    server._handle_message(messages.CancelMessage(id=42))
+    assert server._messages.qsize() == 0
+
+
+def test_cancel_drops_remaining_fragments(tornado_pair):
+    server, _ = tornado_pair
+    server.request_message_factory.build(CallRequestMessage(
+        flags=FlagsType.fragment,
+        headers={'as': 'raw'},
+        args=['endpoint', '', 'a'],
+        id=42,
+    ))
+
+    server._handle_message(messages.CancelMessage(id=42))
+    assert 42 not in server.request_message_factory.message_buffer
+
+    # Fragments that were still on their way are dropped quietly.
+    assert server._is_cancelled_fragment(messages.CallRequestContinueMessage(
+        flags=FlagsType.fragment, args=['b'], id=42,
+    ))
+    assert server._is_cancelled_fragment(messages.CallRequestContinueMessage(
+        args=['c'], id=42,
+    ))
+
+    # Once the last one is in, the ID may be used for new calls.
+    assert not server._is_cancelled_fragment(
+        messages.CallRequestContinueMessage(args=['d'], id=42)
+    )
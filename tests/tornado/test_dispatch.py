@@ -26,6 +26,7 @@ import tornado.concurrent
 
 from tchannel.event import EventType
 from tchannel.messages.error import ErrorCode
+from tchannel.tornado.cache import LRUCache
 from tchannel.tornado.dispatch import RequestDispatcher
 
 
@@ -97,3 +98,17 @@ def test_uncaught_exceptions_fire_event_hook(dispatcher, req, connection):
         req,
         mock.ANY,
     )
+
+
+def test_cache_requires_handlers_that_return_responses():
+    handler = mock.Mock()
+
+    with pytest.raises(AssertionError):
+        RequestDispatcher().register('foo', handler, cache=LRUCache())
+
+    with pytest.raises(AssertionError):
+        RequestDispatcher().register('foo', handler, streaming=True)
+
+    dispatcher = RequestDispatcher(_handler_returns_response=True)
+    dispatcher.register('foo', handler, cache=LRUCache())
+    assert dispatcher.handlers['foo'].cache is not None
@@ -23,8 +23,11 @@
 
 from __future__ import absolute_import
 
+import math
+
 import mock
 import pytest
+import tornado.ioloop
 from tornado import gen
 
 from tchannel.tornado import peer as tpeer
@@ -145,3 +148,330 @@ def test_peer_connection_failure():
         assert got is connection
 
         assert MockConnection.outgoing.call_count == 2
+
+
+def mock_connection(outstanding_requests=0):
+    return mock.MagicMock(
+        closed=False, outstanding_requests=outstanding_requests
+    )
+
+
+@pytest.mark.gen_test
+def test_peer_connect_least_outstanding():
+    peer = tpeer.Peer(mock.MagicMock(), 'localhost:4040', max_connections=3)
+
+    busy = mock_connection(10)
+    idle = mock_connection(2)
+    closed = mock_connection()
+    closed.closed = True
+    peer._out_conns.extend([busy, closed, idle])
+
+    got = yield peer.connect()
+    assert got is idle
+
+
+@pytest.mark.gen_test
+def test_peer_connect_grows_past_threshold():
+    MockConnection = mock.MagicMock()
+    new_conn = mock_connection()
+    MockConnection.outgoing.return_value = gen.maybe_future(new_conn)
+
+    with mock.patch.object(tpeer.Peer, 'connection_class', MockConnection):
+        peer = tpeer.Peer(
+            mock.MagicMock(), 'localhost:4040',
+            max_connections=2, grow_threshold=5,
+        )
+        conn = mock_connection(4)
+        peer._out_conns.append(conn)
+
+        got = yield peer.connect()
+        assert got is conn
+        assert not MockConnection.outgoing.called
+
+        # Past the threshold, the existing connection is still used while
+        # another one is made in the background.
+        conn.outstanding_requests = 5
+        got = yield peer.connect()
+        assert got is conn
+        assert MockConnection.outgoing.call_count == 1
+        assert peer.outgoing_connections == [new_conn, conn]
+
+        # Doesn't grow past max_connections.
+        new_conn.outstanding_requests = 5
+        yield peer.connect()
+        assert MockConnection.outgoing.call_count == 1
+
+
+def test_peer_forgets_closed_connections():
+    peer = tpeer.Peer(mock.MagicMock(), 'localhost:4040')
+    conn = mock_connection()
+    peer.register_incoming(conn)
+    assert peer.incoming_connections == [conn]
+
+    # Simulate the connection closing.
+    conn.set_close_callback.call_args[0][0]()
+    assert peer.connections == []
+
+
+def test_peer_closes_idle_connections():
+    peer = tpeer.Peer(mock.MagicMock(), 'localhost:4040')
+
+    idle = mock.MagicMock(idle=True, last_activity=10)
+    busy = mock.MagicMock(idle=False, last_activity=10)
+    recent = mock.MagicMock(idle=True, last_activity=30)
+    for conn in (idle, busy, recent):
+        peer.register_incoming(conn)
+
+    peer.close_idle_connections(idle_since=20)
+
+    idle.close.assert_called_once_with()
+    assert not busy.close.called
+    assert not recent.close.called
+
+
+def test_peer_group_indexes_connected_peers():
+    peer_group = tpeer.PeerGroup(mock.MagicMock())
+    peer = peer_group.get('localhost:4040')
+    assert peer in peer_group.unconnected_peers
+    assert peer not in peer_group.connected_peers
+
+    conn = mock_connection()
+    peer.register_incoming(conn)
+    assert peer in peer_group.connected_peers
+    assert peer not in peer_group.unconnected_peers
+
+    conn.closed = True
+    conn.set_close_callback.call_args[0][0]()
+    assert peer in peer_group.unconnected_peers
+
+    peer_group.remove('localhost:4040')
+    assert not peer_group.connected_peers
+    assert not peer_group.unconnected_peers
+
+
+def test_peer_set():
+    peers = tpeer.PeerSet()
+    a, b, c = object(), object(), object()
+    for p in (a, b, c, a):
+        peers.add(p)
+    assert len(peers) == 3
+
+    peers.discard(a)
+    peers.discard(a)
+    assert set(peers) == set([b, c])
+    assert peers.random() in (b, c)
+
+    peers.discard(c)
+    assert list(peers) == [b]
+
+
+def test_two_choices_chooser_prefers_connected_peers():
+    peer_group = tpeer.PeerGroup(
+        mock.MagicMock(), chooser=tpeer.TwoChoicesChooser()
+    )
+    for i in xrange(10):
+        peer_group.get('localhost:404%d' % i)
+    connected = peer_group.get('localhost:4045')
+    connected.register_incoming(mock_connection())
+
+    for _ in xrange(10):
+        assert peer_group.choose() is connected
+
+    # Blacklisted peers are never chosen even if they're the only connected
+    # ones.
+    chosen = peer_group.choose(blacklist=set(['localhost:4045']))
+    assert chosen is not connected
+    assert chosen in peer_group.unconnected_peers
+
+
+def test_two_choices_chooser_no_eligible_peers():
+    peer_group = tpeer.PeerGroup(
+        mock.MagicMock(), chooser=tpeer.TwoChoicesChooser()
+    )
+    assert peer_group.choose() is None
+
+    peer_group.get('localhost:4040')
+    assert peer_group.choose(blacklist=set(['localhost:4040'])) is None
+
+
+def test_least_pending_scorer():
+    scorer = tpeer.LeastPendingScorer()
+    peer_group = tpeer.PeerGroup(mock.MagicMock(), scorer=scorer)
+
+    idle = peer_group.get('localhost:4040')
+    idle.register_incoming(mock_connection(0))
+    busy = peer_group.get('localhost:4041')
+    busy.register_incoming(mock_connection(3))
+    busy.register_incoming(mock_connection(2))
+    unconnected = peer_group.get('localhost:4042')
+
+    assert busy.outstanding_requests == 5
+    assert scorer.score(idle) > scorer.score(busy) > scorer.score(unconnected)
+
+    for _ in xrange(10):
+        assert peer_group.choose() is idle
+
+    idle.connections[0].outstanding_requests = 10
+    assert peer_group.choose() is busy
+
+
+def test_choose_with_scorer_override():
+    peer_group = tpeer.PeerGroup(mock.MagicMock())
+    peer_group.get('localhost:4040')
+    preferred = peer_group.get('localhost:4041')
+
+    scorer = mock.Mock()
+    scorer.score.side_effect = lambda peer: 1 if peer is preferred else 0.5
+
+    assert peer_group.choose(scorer=scorer) is preferred
+
+
+def test_peer_stats_moving_average():
+    stats = tpeer.PeerStats(alpha=0.5, decay_time=10, default_latency=0.1)
+
+    # Peers without data get the defaults.
+    assert stats.latency(0) == 0.1
+    assert stats.error_rate(0) == 0
+
+    stats.record_response(100, 0.2)
+    stats.record_error(100, 0.4)
+    assert abs(stats.latency(100) - 0.275) < 1e-9
+    assert abs(stats.error_rate(100) - 0.5) < 1e-9
+
+    # Stale averages decay back to the defaults.
+    assert abs(stats.latency(110) - (0.1 + 0.175 / math.e)) < 1e-9
+    assert abs(stats.latency(1000) - 0.1) < 1e-9
+    assert stats.error_rate(1000) < 1e-9
+
+
+def test_ewma_scorer_prefers_fast_peers():
+    scorer = tpeer.EWMAScorer()
+    peer_group = tpeer.PeerGroup(mock.MagicMock(), scorer=scorer)
+    now = tornado.ioloop.IOLoop.current().time()
+
+    fast = peer_group.get('localhost:4040')
+    fast.register_incoming(mock_connection())
+    fast.stats.record_response(now, 0.01)
+
+    slow = peer_group.get('localhost:4041')
+    slow.register_incoming(mock_connection())
+    slow.stats.record_response(now, 0.5)
+
+    failing = peer_group.get('localhost:4042')
+    failing.register_incoming(mock_connection())
+    failing.stats.record_error(now, 0.01)
+
+    assert scorer.score(fast) > scorer.score(slow)
+    assert scorer.score(fast) > scorer.score(failing)
+    for _ in xrange(10):
+        assert peer_group.choose() is fast
+
+
+def test_ewma_scorer_prefers_fresh_fast_peers_over_stale_slow_ones():
+    scorer = tpeer.EWMAScorer()
+    peer_group = tpeer.PeerGroup(mock.MagicMock(), scorer=scorer)
+    now = tornado.ioloop.IOLoop.current().time()
+
+    stale = peer_group.get('localhost:4040')
+    stale.register_incoming(mock_connection())
+    stale.stats.record_response(now - 1000, 0.5)
+
+    fresh = peer_group.get('localhost:4041')
+    fresh.register_incoming(mock_connection())
+    fresh.stats.record_response(now, 0.01)
+
+    unknown = peer_group.get('localhost:4042')
+    unknown.register_incoming(mock_connection())
+
+    assert scorer.score(fresh) > scorer.score(stale)
+    assert scorer.score(fresh) > scorer.score(unknown)
+    for _ in xrange(10):
+        assert peer_group.choose() is fresh
+
+
+def test_choose_skips_ejected_peers():
+    peer_group = tpeer.PeerGroup(mock.MagicMock())
+    ejected = peer_group.get('localhost:4040')
+    ejected.state = mock.Mock(**{'score.return_value': 1})
+    other = peer_group.get('localhost:4041')
+
+    now = tornado.ioloop.IOLoop.current().time()
+    for _ in xrange(ejected.breaker.max_failures):
+        ejected.breaker.record_failure(now, now)
+
+    assert peer_group.choose() is other
+
+    # Explicitly requested peers are still returned.
+    assert peer_group.choose(hostport='localhost:4040') is ejected
+
+
+def test_choose_reserves_the_probe():
+    peer_group = tpeer.PeerGroup(mock.MagicMock())
+    peer = peer_group.get('localhost:4040')
+    peer.state = mock.Mock(**{'score.return_value': 1})
+
+    now = tornado.ioloop.IOLoop.current().time()
+    for _ in xrange(peer.breaker.max_failures):
+        peer.breaker.record_failure(now - 10, now - 10)
+
+    # Only one request gets to probe the peer while it's connecting.
+    assert peer_group.choose() is peer
+    assert peer_group.choose() is None
+
+
+def test_consistent_hash_chooser():
+    chooser = tpeer.ConsistentHashChooser()
+    peer_group = tpeer.PeerGroup(mock.MagicMock(), chooser=chooser)
+    for i in xrange(10):
+        peer_group.get('localhost:40%02d' % i)
+
+    keys = ['key%d' % i for i in xrange(100)]
+    before = dict((key, peer_group.choose(shard_key=key)) for key in keys)
+
+    # The same key always goes to the same peer.
+    for key in keys:
+        assert peer_group.choose(shard_key=key) is before[key]
+    assert len(set(before.values())) > 1
+
+    # Only the keys of a removed peer move.
+    removed = before['key0']
+    peer_group.remove(removed.hostport)
+    for key in keys:
+        chosen = peer_group.choose(shard_key=key)
+        if before[key] is removed:
+            assert chosen is not removed
+        else:
+            assert chosen is before[key]
+
+    # Blacklisted peers are skipped.
+    other = peer_group.choose(
+        shard_key='key1', blacklist=set([before['key1'].hostport])
+    )
+    assert other is not None
+    assert other is not before['key1']
+
+
+def test_consistent_hash_chooser_bounded_load():
+    chooser = tpeer.ConsistentHashChooser()
+    peer_group = tpeer.PeerGroup(mock.MagicMock(), chooser=chooser)
+    for i in xrange(4):
+        peer = peer_group.get('localhost:404%d' % i)
+        peer.register_incoming(mock_connection())
+
+    usual = peer_group.choose(shard_key='hot')
+    usual.connections[0].outstanding_requests = 10
+
+    spillover = peer_group.choose(shard_key='hot')
+    assert spillover is not usual
+
+    usual.connections[0].outstanding_requests = 0
+    assert peer_group.choose(shard_key='hot') is usual
+
+
+def test_consistent_hash_chooser_without_shard_key():
+    fallback = mock.Mock()
+    chooser = tpeer.ConsistentHashChooser(fallback=fallback)
+    peer_group = tpeer.PeerGroup(mock.MagicMock(), chooser=chooser)
+    peer_group.get('localhost:4040')
+
+    assert peer_group.choose() is fallback.choose.return_value
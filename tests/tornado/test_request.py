@@ -20,9 +20,12 @@
 
 from __future__ import absolute_import
 
+import pytest
+
 from tchannel.messages.common import FlagsType
 from tchannel.tornado.request import Request
 from tchannel.tornado.request import TransportMetadata
+from tchannel.tornado.stream import InMemStream
 
 
 def test_transport_metadata_creation():
@@ -40,3 +43,60 @@ def test_transport_metadata_creation():
     assert 100 == meta.ttl
     assert 'some_service' == meta.service
     assert {'cn': 'another_service', 'as': 'thrift'} == meta.headers
+
+
+@pytest.mark.gen_test
+def test_clone():
+    request = Request(
+        id=1,
+        ttl=100,
+        service='some_service',
+        headers={'as': 'raw'},
+        argstreams=[
+            InMemStream('endpoint'), InMemStream('header'), InMemStream('body')
+        ],
+        endpoint='endpoint',
+    )
+    request.close_argstreams()
+
+    copy = request.clone(2)
+    assert copy.id == 2
+    assert copy.ttl == 100
+    assert copy.service == 'some_service'
+    assert copy.headers == {'as': 'raw'}
+    assert copy.endpoint == 'endpoint'
+    assert copy.argstreams is not request.argstreams
+
+    # The copy is a sibling span in the same trace.
+    assert copy.tracing.trace_id == request.tracing.trace_id
+    assert copy.tracing.parent_span_id == request.tracing.parent_span_id
+    assert copy.tracing.span_id != request.tracing.span_id
+
+    body = yield copy.get_body()
+    assert body == 'body'
+
+    # The original is untouched.
+    body = yield request.get_body()
+    assert body == 'body'
+
+
+@pytest.mark.gen_test
+def test_rewind_rebuilds_argstreams_from_snapshot():
+    body = 'body' * 100
+    request = Request(
+        id=1,
+        argstreams=[
+            InMemStream('endpoint'), InMemStream('header'), InMemStream(body)
+        ],
+    )
+    request.close_argstreams()
+
+    # Consume the args like sending the request would.
+    value = yield request.get_body()
+    assert value == body
+
+    request.rewind(2)
+    assert request.id == 2
+    value = yield request.get_body()
+    # The chunk is shared with the original request, not copied.
+    assert value is body
@@ -70,3 +70,31 @@ def test_should_error_if_call_listen_twice(tchannel):
 
     with pytest.raises(AlreadyListeningError):
         tchannel.listen()
+
+
+def test_subchannel(tchannel):
+    tchannel.peers.add('localhost:4040')
+    subchannel = tchannel.subchannel(
+        'foo', known_peers=['localhost:4041'], score_threshold=0.5,
+    )
+
+    assert tchannel.subchannel('foo') is subchannel
+    assert subchannel.hosts == ['localhost:4041']
+    assert not tchannel.peers.lookup('localhost:4041')
+
+    # Requests for the service only consider peers of the subchannel.
+    assert tchannel.request(service='foo').peer_group is subchannel
+    assert tchannel.request(service='bar').peer_group is tchannel.peers
+
+    # Known peers can be added later.
+    tchannel.subchannel(
+        'foo', known_peers=['localhost:4041', 'localhost:4042']
+    )
+    assert sorted(subchannel.hosts) == ['localhost:4041', 'localhost:4042']
+
+
+@pytest.mark.gen_test
+def test_close_clears_subchannels(tchannel):
+    subchannel = tchannel.subchannel('foo', known_peers=['localhost:4041'])
+    yield tchannel.close()
+    assert not subchannel.hosts
@@ -23,22 +23,65 @@ from __future__ import absolute_import
 import pytest
 import tornado.gen
 
-from tchannel.errors import TimeoutError
-from tchannel.tornado.timeout import timeout
+from tchannel.tornado.timeout import TimerWheel
 
 
 @pytest.mark.gen_test
-def test_timeout(io_loop):
+def test_timer_wheel_expires_in_batches(io_loop):
+    expired = []
+    wheel = TimerWheel(expired.append, tick=0.01, io_loop=io_loop)
 
-    sleep_time = 0.01
+    wheel.add('a', 0.02)
+    wheel.add('b', 0.02)
+    wheel.add('c', 10)
+    assert len(wheel) == 3
 
-    @tornado.gen.coroutine
-    def slow_method():
-        yield tornado.gen.sleep(sleep_time * 10)
-        raise tornado.gen.Return('foo')
+    yield tornado.gen.sleep(0.05)
+    assert sorted(expired[0]) == ['a', 'b']
+    assert len(expired) == 1
+    assert 'c' in wheel
+    assert 'a' not in wheel
 
-    slow_future = slow_method()
 
-    with pytest.raises(TimeoutError):
-        with timeout(slow_future, sleep_time, io_loop):
-            yield slow_future
+@pytest.mark.gen_test
+def test_timer_wheel_cancel(io_loop):
+    expired = []
+    wheel = TimerWheel(expired.append, tick=0.01, io_loop=io_loop)
+
+    wheel.add('a', 0.02)
+    wheel.add('b', 0.02)
+    wheel.cancel('a')
+    wheel.cancel('unknown')
+
+    yield tornado.gen.sleep(0.05)
+    assert expired == [['b']]
+    assert len(wheel) == 0
+
+
+@pytest.mark.gen_test
+def test_timer_wheel_timeouts_longer_than_a_turn(io_loop):
+    expired = []
+    wheel = TimerWheel(expired.append, tick=0.01, slots=4, io_loop=io_loop)
+
+    # Both land in the same slot, a full turn apart.
+    wheel.add('a', 0.01)
+    wheel.add('b', 0.05)
+
+    yield tornado.gen.sleep(0.03)
+    assert expired == [['a']]
+
+    yield tornado.gen.sleep(0.05)
+    assert expired == [['a'], ['b']]
+
+
+@pytest.mark.gen_test
+def test_timer_wheel_clear(io_loop):
+    expired = []
+    wheel = TimerWheel(expired.append, tick=0.01, io_loop=io_loop)
+
+    wheel.add('a', 0.01)
+    wheel.clear()
+    assert len(wheel) == 0
+
+    yield tornado.gen.sleep(0.03)
+    assert expired == []